@@ -1,60 +1,1545 @@
+import bisect
+import heapq
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используются реализации на чистом Python
+    np = None
+
+
+# Бинарный снимок графа: заголовок, таблица имён вершин и CSR-массивы.
+# Каждая секция выровнена по 8 байтам, чтобы массивы можно было читать прямо из mmap.
+SNAPSHOT_MAGIC = b'GRAPHCSR'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sIIqq')  # magic, версия, флаги, число вершин, число рёбер
+SNAPSHOT_DIRECTED = 1
+SNAPSHOT_WEIGHTED = 2
+SNAPSHOT_BIG_ENDIAN = 4
+SNAPSHOT_LANDMARKS = 8  # После весов записаны таблицы расстояний до ориентиров (ALT)
+
+
+class VertexIndex:
+    """
+    Таблица интернирования имён вершин: каждому имени один раз сопоставляется
+    плотный целый номер 0..n-1. Алгоритмы работают с номерами, а имена
+    используются только при выводе результата.
+    """
+    def __init__(self, names=()):
+        self.names = []  # Номер -> имя
+        self.ids = {}  # Имя -> номер
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def add(self, name):
+        # Возвращает номер вершины, присваивая новый, если имя встречается впервые
+        vertex_id = self.ids.get(name)
+        if vertex_id is None:
+            vertex_id = len(self.names)
+            self.ids[name] = vertex_id
+            self.names.append(name)
+        return vertex_id
+
+    def remove(self, name):
+        # Освободившийся номер занимает последняя вершина, чтобы нумерация оставалась плотной
+        vertex_id = self.ids.pop(name)
+        last = self.names.pop()
+        if last != name:
+            self.names[vertex_id] = last
+            self.ids[last] = vertex_id
+        return vertex_id
+
+
+class DegreeIndex:
+    """
+    Полустепени исхода по номерам вершин и корзины «степень -> номера вершин»
+    с отсортированным списком непустых степеней. Запросы «степень больше d»
+    и «k вершин с наибольшей степенью» выполняются за O(log V + k).
+    """
+    def __init__(self, degrees=()):
+        self.degree = array('i', degrees)
+        self.buckets = {}
+        for vertex_id, degree in enumerate(self.degree):
+            self.buckets.setdefault(degree, set()).add(vertex_id)
+        self.levels = sorted(self.buckets)  # Непустые степени по возрастанию
+
+    def _put(self, vertex_id, degree):
+        bucket = self.buckets.get(degree)
+        if bucket is None:
+            bucket = self.buckets[degree] = set()
+            bisect.insort(self.levels, degree)
+        bucket.add(vertex_id)
+
+    def _take(self, vertex_id, degree):
+        bucket = self.buckets[degree]
+        bucket.discard(vertex_id)
+        if not bucket:
+            del self.buckets[degree]
+            del self.levels[bisect.bisect_left(self.levels, degree)]
+
+    def add_vertex(self):
+        self.degree.append(0)
+        self._put(len(self.degree) - 1, 0)
+
+    def change(self, vertex_id, delta):
+        degree = self.degree[vertex_id]
+        self._take(vertex_id, degree)
+        self._put(vertex_id, degree + delta)
+        self.degree[vertex_id] = degree + delta
+
+    def remove_vertex(self, vertex_id):
+        # Нумерация как в VertexIndex.remove: освободившийся номер занимает последняя вершина
+        self._take(vertex_id, self.degree[vertex_id])
+        last = len(self.degree) - 1
+        if vertex_id != last:
+            degree = self.degree[last]
+            self._take(last, degree)
+            self._put(vertex_id, degree)
+            self.degree[vertex_id] = degree
+        self.degree.pop()
+
+    def above(self, degree):
+        # Номера вершин со степенью больше degree, от большей степени к меньшей
+        for level in reversed(self.levels[bisect.bisect_right(self.levels, degree):]):
+            yield from self.buckets[level]
+
+    def top(self, k):
+        result = []
+        for level in reversed(self.levels):
+            for vertex_id in self.buckets[level]:
+                if len(result) == k:
+                    return result
+                result.append(vertex_id)
+        return result
+
+    def histogram(self):
+        return {level: len(self.buckets[level]) for level in self.levels}
+
+
+class DisjointSet:
+    """
+    Система непересекающихся множеств на плоских массивах: сжатие путей
+    и объединение по рангу дают почти O(1) на операцию.
+    """
+    def __init__(self, size=0):
+        self.parent = array('i', range(size))
+        self.rank = bytearray(size)  # Ранг не превышает log2(size), байта достаточно
+        self.count = size  # Число множеств
+
+    def __len__(self):
+        return len(self.parent)
+
+    def add(self):
+        # Добавляет новое одноэлементное множество и возвращает его номер
+        element = len(self.parent)
+        self.parent.append(element)
+        self.rank.append(0)
+        self.count += 1
+        return element
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # Сжатие путей: все вершины на пути сразу подвешиваются к корню
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        # Объединяет множества a и b; возвращает False, если они уже совпадали
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.rank[a] < self.rank[b]:
+            a, b = b, a
+        self.parent[b] = a
+        if self.rank[a] == self.rank[b]:
+            self.rank[a] += 1
+        self.count -= 1
+        return True
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+
+class DistanceMatrix:
+    """
+    Компактная матрица расстояний n x n в одном плоском массиве: int32 с числом шагов
+    (-1 — вершина недостижима) или float32 со взвешенными расстояниями (inf — недостижима).
+    Необязательная матрица предшественников parents того же вида: parents[i * n + j] —
+    вершина перед j на кратчайшем пути из i (-1 для самой i и недостижимых вершин).
+    """
+    def __init__(self, names, data, weighted=False, parents=None):
+        self.names = names
+        self.data = data
+        self.weighted = weighted
+        self.parents = parents
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, i, j):
+        distance = self.data[i * len(self.names) + j]
+        if not self.weighted and distance < 0:
+            return float('inf')
+        return distance
+
+    def row(self, i):
+        n = len(self.names)
+        return [self.get(i, j) for j in range(n)]
+
+    def path(self, i, j):
+        # Путь из i в j по матрице предшественников за O(длины пути); None, если пути нет
+        if self.parents is None:
+            raise ValueError("Матрица расстояний построена без предшественников (with_parents=False).")
+        if self.get(i, j) == float('inf'):
+            return None
+        return CSRGraph.parent_path(self.parents, j, i * len(self.names))
+
+    def items(self):
+        # Ленивый перебор троек (номер начала, номер конца, расстояние) по строкам матрицы
+        n = len(self.names)
+        for i in range(n):
+            for j in range(n):
+                yield i, j, self.get(i, j)
+
+
+class ShortestPathTree:
+    """
+    Кратчайшие пути из одной вершины: расстояния по номерам вершин (unreached, по
+    умолчанию inf, — вершина недостижима) и необязательный массив предков для
+    восстановления самих путей. Для длиннейших путей в DAG unreached равно -inf.
+    """
+    def __init__(self, names, index, source, distances, parents=None, weighted=False, unreached=float('inf')):
+        self.names = names
+        self.index = index
+        self.source = source
+        self.distances = distances
+        self.parents = parents
+        self.weighted = weighted
+        self.unreached = unreached
+
+    def __len__(self):
+        return len(self.names)
+
+    def distance(self, vertex):
+        return self.distances[self.index[vertex]]
+
+    def path(self, vertex):
+        # Путь из исходной вершины по массиву предков за O(длины пути); None, если пути нет
+        if self.parents is None:
+            raise ValueError("Кратчайшие пути найдены без массива предков (with_parents=False).")
+        target = self.index[vertex]
+        if self.distances[target] == self.unreached:
+            return None
+        return [self.names[v] for v in CSRGraph.parent_path(self.parents, target)]
+
+    def reachable(self):
+        # Ленивый перебор пар (вершина, расстояние) для достижимых вершин
+        for i, distance in enumerate(self.distances):
+            if distance != self.unreached:
+                yield self.names[i], distance
+
+    def unreachable(self):
+        for i, distance in enumerate(self.distances):
+            if distance == self.unreached:
+                yield self.names[i]
+
+
+class CSRGraph:
+    """
+    Замороженное представление графа в формате CSR (compressed sparse row).
+    Вершины пронумерованы плотными целыми числами 0..n-1: соседи вершины i лежат
+    в targets[offsets[i]:offsets[i + 1]], веса рёбер — в weights по тем же индексам.
+    """
+    def __init__(self, names, offsets, targets, weights=None, directed=False, weighted=False, index=None):
+        self.names = names  # Номер вершины -> имя
+        if index is None:
+            index = {name: i for i, name in enumerate(names)}
+        self.index = index  # Имя вершины -> номер
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights  # None для невзвешенного графа
+        self.directed = directed
+        self.weighted = weighted
+        # Ориентиры для оценок A* (ALT): номера вершин и таблицы расстояний
+        # от ориентиров и до них, по строке длины n на каждый ориентир
+        self.landmarks = None
+        self.landmark_from = None
+        self.landmark_to = None
+        self._negative = None  # Есть ли рёбра отрицательного веса; считается при первом запросе
+
+    @classmethod
+    def from_graph(cls, graph):
+        # Нумерация берётся из таблицы интернирования графа, поэтому номера
+        # вершин совпадают с graph.vertex_index и не пересчитываются
+        names = list(graph.vertex_index.names)
+        index = dict(graph.vertex_index.ids)
+        offsets = array('q', [0])
+        targets = array('i')
+        weights = array('d') if graph.weighted else None
+
+        for vertex in names:
+            for edge in graph.adjacency_list[vertex]:
+                targets.append(index[edge[0]])
+                if weights is not None:
+                    weights.append(edge[1])
+            offsets.append(len(targets))
+
+        return cls(names, offsets, targets, weights, graph.directed, graph.weighted, index)
+
+    @classmethod
+    def from_file(cls, filename, unique_edges=False):
+        """
+        Строит CSR прямо из текстового файла графа, без списков смежности и кортежей
+        на каждое ребро: рёбра копятся в плоских массивах начал, концов и весов, затем
+        раскладываются по строкам сортировкой подсчётом, O(V + E). Нумерация вершин
+        и порядок рёбер те же, что у Graph.load_from_file. unique_edges — схлопнуть
+        кратные рёбра (остаётся первая позиция и последний вес).
+        """
+        names = []
+        index = {}
+        sources = array('i')
+        ends = array('i')
+
+        def intern(name):
+            vertex = index.get(name)
+            if vertex is None:
+                vertex = index[name] = len(names)
+                names.append(name)
+            return vertex
+
+        with open(filename, 'r') as file:
+            header = file.readline().strip().lower().split()
+            directed = header[0] == 'directed'
+            weighted = header[1] == 'weighted'
+            edge_weights = array('d') if weighted else None
+
+            for line in file:
+                parts = line.split()
+
+                if not parts:
+                    continue
+
+                if len(parts) == 1:
+                    intern(parts[0])
+                    continue
+
+                weight = float(parts[2]) if weighted else None
+                u, v = intern(parts[0]), intern(parts[1])
+                sources.append(u)
+                ends.append(v)
+                if weighted:
+                    edge_weights.append(weight)
+                if not directed and u != v:
+                    sources.append(v)
+                    ends.append(u)
+                    if weighted:
+                        edge_weights.append(weight)
+
+        # Сортировка подсчётом по началу ребра; внутри строки сохраняется порядок файла
+        n, m = len(names), len(sources)
+        offsets = array('q', [0]) * (n + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+        fill = array('q', offsets)
+        targets = array('i', [0]) * m
+        weights = array('d', [0.0]) * m if weighted else None
+        for k in range(m):
+            u = sources[k]
+            position = fill[u]
+            fill[u] = position + 1
+            targets[position] = ends[k]
+            if weights is not None:
+                weights[position] = edge_weights[k]
+        del sources, ends, edge_weights, fill
+
+        if unique_edges:
+            # seen[v] — позиция ребра в v в текущей строке (позиции прошлых строк меньше начала)
+            seen = array('q', [-1]) * n
+            write = 0
+            for u in range(n):
+                start = write
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    if seen[v] >= start:
+                        if weights is not None:
+                            weights[seen[v]] = weights[k]
+                        continue
+                    seen[v] = write
+                    targets[write] = v
+                    if weights is not None:
+                        weights[write] = weights[k]
+                    write += 1
+                offsets[u] = start
+            offsets[n] = write
+            del targets[write:]
+            if weights is not None:
+                del weights[write:]
+
+        return cls(names, offsets, targets, weights, directed, weighted, index)
+
+    def vertex_count(self):
+        return len(self.names)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def neighbors(self, i):
+        # Номера соседей вершины i
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def find_cycle(self):
+        """
+        Поиск ориентированного цикла нерекурсивным DFS с тремя цветами вершин,
+        O(V + E); глубина обхода не ограничена стеком вызовов Python.
+        Возвращает цикл списком номеров вершин (первая совпадает с последней) или None.
+        """
+        offsets, targets = self.offsets, self.targets
+        WHITE, GRAY, BLACK = 0, 1, 2
+        color = bytearray(self.vertex_count())
+
+        for root in range(self.vertex_count()):
+            if color[root] != WHITE:
+                continue
+            # Явный стек: вершины текущего пути и позиция следующего ребра для каждой
+            path = [root]
+            next_edge = [offsets[root]]
+            color[root] = GRAY
+
+            while path:
+                vertex = path[-1]
+                k = next_edge[-1]
+                if k == offsets[vertex + 1]:
+                    # Все рёбра просмотрены — вершина закрыта
+                    color[vertex] = BLACK
+                    path.pop()
+                    next_edge.pop()
+                    continue
+                next_edge[-1] = k + 1
+                neighbor = targets[k]
+                if color[neighbor] == GRAY:
+                    # Ребро назад в текущий путь: цикл от neighbor до vertex
+                    return path[path.index(neighbor):] + [neighbor]
+                if color[neighbor] == WHITE:
+                    color[neighbor] = GRAY
+                    path.append(neighbor)
+                    next_edge.append(offsets[neighbor])
+
+        return None
+
+    def core_numbers(self):
+        """
+        Номера ядер вершин алгоритмом Батагеля–Заверсника: вершины лежат в массиве,
+        упорядоченном по степени корзинами, и «снимаются» от меньшей степени к большей
+        с уменьшением степеней соседей на месте. O(V + E). Петли не учитываются.
+        """
+        offsets, targets = self.offsets, self.targets
+        n = self.vertex_count()
+        degree = array('i', [0]) * n
+        for v in range(n):
+            for k in range(offsets[v], offsets[v + 1]):
+                if targets[k] != v:
+                    degree[v] += 1
+
+        # Сортировка вершин подсчётом по степени: bin_start[d] — начало корзины степени d
+        max_degree = max(degree, default=0)
+        bin_start = array('i', [0]) * (max_degree + 2)
+        for d in degree:
+            bin_start[d + 1] += 1
+        for d in range(max_degree + 1):
+            bin_start[d + 1] += bin_start[d]
+        position = array('i', [0]) * n
+        vertices = array('i', [0]) * n
+        fill = array('i', bin_start)
+        for v in range(n):
+            position[v] = fill[degree[v]]
+            vertices[position[v]] = v
+            fill[degree[v]] += 1
+
+        for i in range(n):
+            v = vertices[i]
+            for k in range(offsets[v], offsets[v + 1]):
+                u = targets[k]
+                if degree[u] > degree[v]:
+                    # Переносим u в начало его корзины и уменьшаем степень
+                    du = degree[u]
+                    w = vertices[bin_start[du]]
+                    if u != w:
+                        pu, pw = position[u], bin_start[du]
+                        vertices[pu], vertices[pw] = w, u
+                        position[u], position[w] = pw, pu
+                    bin_start[du] += 1
+                    degree[u] -= 1
+
+        return list(degree)
+
+    def strongly_connected_components(self):
+        """
+        Компоненты сильной связности нерекурсивным алгоритмом Тарьяна, O(V + E).
+        Рекурсия заменена явным стеком вызовов с позицией следующего ребра.
+        Возвращает массив меток компонент по номерам вершин и число компонент;
+        компоненты пронумерованы в обратном топологическом порядке конденсации.
+        """
+        offsets, targets = self.offsets, self.targets
+        n = self.vertex_count()
+        order = array('i', [-1]) * n  # Порядковый номер посещения вершины
+        low = array('i', [0]) * n
+        labels = array('i', [-1]) * n
+        on_stack = bytearray(n)
+        stack = []
+        counter = 0
+        component_count = 0
+
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            calls = [root]
+            next_edge = [offsets[root]]
+
+            while calls:
+                vertex = calls[-1]
+                k = next_edge[-1]
+                if k < offsets[vertex + 1]:
+                    next_edge[-1] = k + 1
+                    neighbor = targets[k]
+                    if order[neighbor] == -1:
+                        # «Рекурсивный вызов» для непосещённого соседа
+                        order[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        on_stack[neighbor] = 1
+                        calls.append(neighbor)
+                        next_edge.append(offsets[neighbor])
+                    elif on_stack[neighbor] and order[neighbor] < low[vertex]:
+                        low[vertex] = order[neighbor]
+                    continue
+
+                # «Возврат из вызова»: передаём low родителю
+                calls.pop()
+                next_edge.pop()
+                if calls and low[vertex] < low[calls[-1]]:
+                    low[calls[-1]] = low[vertex]
+                if low[vertex] == order[vertex]:
+                    # vertex — корень компоненты: снимаем её со стека
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        labels[member] = component_count
+                        if member == vertex:
+                            break
+                    component_count += 1
+
+        return labels, component_count
+
+    def condensation(self, labels, component_count):
+        """
+        Конденсация графа: каждая компонента сильной связности становится вершиной,
+        кратные рёбра между компонентами склеиваются. Возвращает ацикличный CSRGraph,
+        вершины которого — номера компонент.
+        """
+        offsets, targets = self.offsets, self.targets
+        # Группируем вершины по компонентам сортировкой подсчётом
+        start = array('q', [0]) * (component_count + 1)
+        for label in labels:
+            start[label + 1] += 1
+        for c in range(component_count):
+            start[c + 1] += start[c]
+        members = array('i', [0]) * self.vertex_count()
+        fill = array('q', start)
+        for vertex, label in enumerate(labels):
+            members[fill[label]] = vertex
+            fill[label] += 1
+
+        dag_offsets = array('q', [0])
+        dag_targets = array('i')
+        seen = array('i', [-1]) * component_count  # seen[d] == c — ребро c -> d уже добавлено
+        for c in range(component_count):
+            for i in range(start[c], start[c + 1]):
+                vertex = members[i]
+                for k in range(offsets[vertex], offsets[vertex + 1]):
+                    d = labels[targets[k]]
+                    if d != c and seen[d] != c:
+                        seen[d] = c
+                        dag_targets.append(d)
+            dag_offsets.append(len(dag_targets))
+
+        return CSRGraph(list(range(component_count)), dag_offsets, dag_targets, directed=True)
+
+    def topological_order(self):
+        """
+        Топологическая сортировка алгоритмом Кана по массиву полустепеней захода, O(V + E).
+        Возвращает список номеров вершин или None, если в графе есть цикл.
+        """
+        offsets, targets = self.offsets, self.targets
+        n = self.vertex_count()
+        in_degree = array('i', [0]) * n
+        for k in range(self.edge_count()):
+            in_degree[targets[k]] += 1
+
+        order = [v for v in range(n) if in_degree[v] == 0]
+        # order сам служит очередью: head указывает на следующую вершину
+        head = 0
+        while head < len(order):
+            vertex = order[head]
+            head += 1
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[k]
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    order.append(neighbor)
+
+        return order if len(order) == n else None
+
+    def dag_paths(self, order, sources, longest=False):
+        """
+        Кратчайшие (или длиннейшие при longest=True) пути в ацикличном графе одним
+        проходом релаксации в топологическом порядке, O(V + E).
+        sources — номера начальных вершин (расстояние до них 0).
+        Возвращает расстояния и предков на найденных путях (-1 — предка нет).
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        n = self.vertex_count()
+        unreached = float('-inf') if longest else float('inf')
+        distances = [unreached] * n
+        parents = array('i', [-1]) * n
+        for source in sources:
+            distances[source] = 0
+
+        for vertex in order:
+            distance = distances[vertex]
+            if distance == unreached:
+                continue
+            for k in range(offsets[vertex], offsets[vertex + 1]):
+                neighbor = targets[k]
+                candidate = distance + (weights[k] if weights is not None else 1)
+                if (candidate > distances[neighbor]) if longest else (candidate < distances[neighbor]):
+                    distances[neighbor] = candidate
+                    parents[neighbor] = vertex
+
+        return distances, parents
+
+    def transpose(self):
+        """
+        Граф с обращёнными рёбрами (для неориентированного — он сам). Строится сортировкой
+        подсчётом за O(V + E) и запоминается, так как снимок не изменяется.
+        """
+        if not self.directed:
+            return self
+        if getattr(self, '_reverse', None) is None:
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+            n = self.vertex_count()
+            reverse_offsets = array('q', [0]) * (n + 1)
+            for k in range(self.edge_count()):
+                reverse_offsets[targets[k] + 1] += 1
+            for v in range(n):
+                reverse_offsets[v + 1] += reverse_offsets[v]
+            fill = array('q', reverse_offsets)
+            reverse_targets = array('i', [0]) * self.edge_count()
+            reverse_weights = array('d', [0.0]) * self.edge_count() if weights is not None else None
+            for u in range(n):
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    position = fill[v]
+                    fill[v] += 1
+                    reverse_targets[position] = u
+                    if weights is not None:
+                        reverse_weights[position] = weights[k]
+            self._reverse = CSRGraph(self.names, reverse_offsets, reverse_targets, reverse_weights,
+                                     True, self.weighted, self.index)
+        return self._reverse
+
+    def bidirectional_bfs(self, source, target):
+        """
+        Расстояние в шагах между двумя вершинами поиском в ширину с двух концов.
+        Каждый раз расширяется меньший из двух фронтов; первая встреча фронтов даёт
+        кратчайший путь. Посещённые вершины хранятся в словарях, поэтому затраты
+        пропорциональны просмотренной части графа, а не её размеру.
+        Возвращает (расстояние, путь номерами вершин) или (inf, None).
+        """
+        if source == target:
+            return 0, [source]
+
+        reverse = self.transpose()
+        # Для каждой стороны: предки найденных вершин и текущий фронт
+        parents = ({source: -1}, {target: -1})
+        frontiers = ([source], [target])
+        graphs = (self, reverse)
+
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            offsets, targets = graphs[side].offsets, graphs[side].targets
+            own, other = parents[side], parents[1 - side]
+            next_frontier = []
+            for vertex in frontiers[side]:
+                for k in range(offsets[vertex], offsets[vertex + 1]):
+                    neighbor = targets[k]
+                    if neighbor in own:
+                        continue
+                    own[neighbor] = vertex
+                    if neighbor in other:
+                        path = self._join_paths(parents, neighbor)
+                        return len(path) - 1, path
+                    next_frontier.append(neighbor)
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+        return float('inf'), None
+
+    @staticmethod
+    def _join_paths(parents, meeting):
+        # Путь от начала до точки встречи по прямым предкам и дальше до цели по обратным
+        forward, backward = parents
+        path = []
+        vertex = meeting
+        while vertex != -1:
+            path.append(vertex)
+            vertex = forward[vertex]
+        path.reverse()
+        vertex = backward[meeting]
+        while vertex != -1:
+            path.append(vertex)
+            vertex = backward[vertex]
+        return path
+
+    def bfs(self, source, with_parents=False):
+        """
+        Обход в ширину на очереди deque (извлечение за O(1)), O(V + E).
+        Возвращает список расстояний в шагах по номерам вершин, а с with_parents —
+        ещё и массив предков дерева кратчайших путей.
+        """
+        offsets, targets = self.offsets, self.targets
+        distances = [float('inf')] * self.vertex_count()
+        distances[source] = 0
+        parents = array('i', [-1]) * self.vertex_count() if with_parents else None
+        queue = deque([source])
+
+        while queue:
+            current = queue.popleft()
+            next_distance = distances[current] + 1
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[k]
+                if distances[neighbor] == float('inf'):  # Если сосед не посещён
+                    distances[neighbor] = next_distance
+                    if parents is not None:
+                        parents[neighbor] = current
+                    queue.append(neighbor)
+
+        if with_parents:
+            return distances, parents
+        return distances
+
+    def dijkstra(self, source, with_parents=False):
+        """
+        Алгоритм Дейкстры на двоичной куче с ленивым удалением: устаревшие записи
+        в куче не удаляются, а пропускаются при извлечении. O((V + E) log V).
+        Возвращает список расстояний по номерам вершин, а с with_parents —
+        ещё и массив предков дерева кратчайших путей.
+        """
+        distances, parents = self._heap_search(source)
+        if with_parents:
+            return distances, parents
+        return distances
+
+    def astar(self, source, target, potential=None):
+        """
+        Поиск A* от source до target. potential(v) — оценка снизу расстояния от v
+        до цели; без неё поиск совпадает с Дейкстрой, остановленной на цели.
+        Возвращает (расстояние, список номеров вершин) или (inf, None).
+        """
+        distances, parents = self._heap_search(source, target, potential)
+        if distances[target] == float('inf'):
+            return float('inf'), None
+        return distances[target], self.parent_path(parents, target)
+
+    @staticmethod
+    def parent_path(parents, target, base=0):
+        """
+        Восстанавливает путь до target по массиву предков за O(длины пути).
+        base — смещение строки, если parents — плоская матрица предшественников.
+        """
+        path = []
+        vertex = target
+        while vertex != -1:
+            path.append(vertex)
+            vertex = parents[base + vertex]
+        path.reverse()
+        return path
+
+    def has_negative_weights(self):
+        # Снимок не изменяется, поэтому веса просматриваются один раз
+        if self._negative is None:
+            self._negative = self.weights is not None and len(self.weights) > 0 and min(self.weights) < 0
+        return self._negative
+
+    def _check_nonnegative(self):
+        # Дейкстра и A* на отрицательных весах дают неверный ответ, а при отрицательном
+        # цикле не завершаются вовсе, поэтому такие графы отклоняются до начала поиска
+        if self.has_negative_weights():
+            raise ValueError("Граф содержит рёбра отрицательного веса: алгоритм Дейкстры неприменим.")
+
+    def _heap_search(self, source, target=-1, potential=None):
+        # Общая релаксация на куче для Дейкстры и A*. Ключ в куче — расстояние плюс
+        # потенциал; при согласованной эвристике вершина извлекается один раз, и A*
+        # извлекает не больше вершин, чем Дейкстра до той же цели
+        self._check_nonnegative()
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        distances = [float('inf')] * self.vertex_count()
+        parents = array('i', [-1]) * self.vertex_count()
+        distances[source] = 0
+        heap = [(potential(source) if potential else 0, 0, source)]
+
+        while heap:
+            _, distance, current = heapq.heappop(heap)
+            if distance > distances[current]:
+                continue  # Вершина уже извлечена с меньшим расстоянием
+            if current == target:
+                break
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[k]
+                candidate = distance + weights[k]
+                if candidate < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    parents[neighbor] = current
+                    key = candidate + potential(neighbor) if potential else candidate
+                    heapq.heappush(heap, (key, candidate, neighbor))
+
+        return distances, parents
+
+    def build_landmarks(self, k, strategy='farthest'):
+        """
+        Предобработка для ALT: выбирает k ориентиров и считает расстояния от каждого
+        из них и до него (во втором случае — Дейкстрой по обращённому графу).
+        strategy='farthest' — каждый следующий ориентир наиболее удалён от уже
+        выбранных, 'degree' — вершины наибольшей степени.
+        """
+        n = self.vertex_count()
+        k = min(k, n)
+        offsets = self.offsets
+        landmark_from = array('d')
+        landmarks = []
+
+        if strategy == 'degree':
+            landmarks = heapq.nlargest(k, range(n), key=lambda v: offsets[v + 1] - offsets[v])
+            for landmark in landmarks:
+                landmark_from.extend(self.dijkstra(landmark))
+        elif k:
+            # Первый ориентир — самая дальняя вершина от вершины наибольшей степени,
+            # далее — вершина с наибольшим расстоянием до ближайшего ориентира
+            # (недостижимые вершины выбираются первыми и покрывают другие компоненты)
+            start = max(range(n), key=lambda v: offsets[v + 1] - offsets[v])
+            distances = self.dijkstra(start)
+            landmark = max(range(n), key=lambda v: distances[v] if distances[v] < float('inf') else -1)
+            nearest = [float('inf')] * n
+            while True:
+                landmarks.append(landmark)
+                distances = self.dijkstra(landmark)
+                landmark_from.extend(distances)
+                if len(landmarks) == k:
+                    break
+                for v in range(n):
+                    if distances[v] < nearest[v]:
+                        nearest[v] = distances[v]
+                landmark = max(range(n), key=nearest.__getitem__)
+                if nearest[landmark] == 0:
+                    break  # Все вершины уже совпадают с ориентирами
+
+        if self.directed:
+            reverse = self.transpose()
+            landmark_to = array('d')
+            for landmark in landmarks:
+                landmark_to.extend(reverse.dijkstra(landmark))
+        else:
+            landmark_to = landmark_from  # В неориентированном графе расстояния симметричны
+
+        self.landmarks = array('i', landmarks)
+        self.landmark_from = landmark_from
+        self.landmark_to = landmark_to
+
+    def landmark_potential(self, target):
+        """
+        Оценка снизу расстояния от вершины до target по неравенству треугольника:
+        d(v, t) >= d(L, t) - d(L, v) и d(v, t) >= d(v, L) - d(t, L) для каждого
+        ориентира L. Оценка согласованна, поэтому годится как потенциал для A*.
+        """
+        inf = float('inf')
+        n = self.vertex_count()
+        landmark_from, landmark_to = self.landmark_from, self.landmark_to
+        rows = [(i * n, landmark_from[i * n + target], landmark_to[i * n + target])
+                for i in range(len(self.landmarks))]
+        directed = self.directed
+
+        def potential(v):
+            best = 0
+            for base, from_target, to_target in rows:
+                from_v = landmark_from[base + v]
+                if from_v < inf:
+                    if from_target == inf:
+                        return inf  # v достижима из ориентира, а цель — нет: из v цель недостижима
+                    if from_target - from_v > best:
+                        best = from_target - from_v
+                if directed:
+                    to_v = landmark_to[base + v]
+                    if to_target < inf:
+                        if to_v == inf:
+                            return inf  # Из цели ориентир достижим, а из v — нет
+                        if to_v - to_target > best:
+                            best = to_v - to_target
+                elif from_v < inf and from_v - from_target > best:
+                    best = from_v - from_target
+            return best
+
+        return potential
+
+    def prim(self, with_parents=False):
+        """
+        Алгоритм Прима на двоичной куче, O(E log V). Запускается из каждой ещё
+        не покрытой вершины, поэтому для несвязного графа строит остовный лес.
+        Возвращает список рёбер (u, v, вес) и число деревьев в лесу, а с with_parents —
+        ещё и массив предков (корень каждого дерева — вершина, с которой оно начато).
+        Рёбра невзвешенного графа считаются единичными, их вес — None.
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        in_tree = bytearray(self.vertex_count())
+        parents = array('i', [-1]) * self.vertex_count()
+        forest = []
+        tree_count = 0
+
+        def push_edges(u):
+            for k in range(offsets[u], offsets[u + 1]):
+                if not in_tree[targets[k]]:
+                    heapq.heappush(heap, (weights[k] if weights is not None else 1, u, k))
+
+        for root in range(self.vertex_count()):
+            if in_tree[root]:
+                continue
+            tree_count += 1
+            in_tree[root] = 1
+            heap = []
+            push_edges(root)
+
+            while heap:
+                weight, u, k = heapq.heappop(heap)
+                v = targets[k]
+                if in_tree[v]:
+                    continue  # Ребро ведёт внутрь уже построенного дерева
+                in_tree[v] = 1
+                parents[v] = u
+                forest.append((u, v, weights[k] if weights is not None else None))
+                push_edges(v)
+
+        if with_parents:
+            return forest, tree_count, parents
+        return forest, tree_count
+
+    def kruskal(self, with_parents=False):
+        """
+        Алгоритм Краскала на системе непересекающихся множеств, O(E log E).
+        Рёбра сортируются по весу одним вызовом (через NumPy, если он установлен).
+        Возвращает остовный лес в том же виде, что и prim().
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        n = self.vertex_count()
+
+        # Каждое неориентированное ребро хранится дважды — берём копию с u < v
+        if np is not None:
+            sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(np.asarray(offsets, dtype=np.int64)))
+            candidates = np.flatnonzero(sources < np.asarray(targets))
+            if weights is not None:
+                order = np.argsort(np.asarray(weights)[candidates], kind='stable')
+                candidates = candidates[order]
+            edges = zip(sources[candidates].tolist(), candidates.tolist())
+        else:
+            candidates = [(u, k) for u in range(n) for k in range(offsets[u], offsets[u + 1]) if u < targets[k]]
+            if weights is not None:
+                candidates.sort(key=lambda edge: weights[edge[1]])
+            edges = candidates
+
+        components = DisjointSet(n)
+        forest = []
+        for u, k in edges:
+            v = targets[k]
+            if components.union(u, v):
+                forest.append((u, v, weights[k] if weights is not None else None))
+                if len(forest) == n - 1:
+                    break
+
+        if with_parents:
+            return forest, components.count, self.forest_parents(forest)
+        return forest, components.count
+
+    def forest_parents(self, forest):
+        """
+        Массив предков для остовного леса из рёбер (u, v, вес), O(V): каждое дерево
+        подвешивается за вершину с наименьшим номером.
+        """
+        n = self.vertex_count()
+        adjacency = [[] for _ in range(n)]
+        for u, v, _ in forest:
+            adjacency[u].append(v)
+            adjacency[v].append(u)
+
+        parents = array('i', [-1]) * n
+        visited = bytearray(n)
+        for root in range(n):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                for v in adjacency[u]:
+                    if not visited[v]:
+                        visited[v] = 1
+                        parents[v] = u
+                        stack.append(v)
+        return parents
+
+    def all_pairs_distances(self, processes=1, with_parents=False):
+        """
+        Кратчайшие расстояния для всех пар вершин: BFS (или Дейкстра для взвешенного графа)
+        из каждой вершины. При processes > 1 исходные вершины делятся между процессами;
+        граф передаётся им один раз через разделяемую память, и каждый процесс пишет свои
+        строки прямо в общую матрицу. processes=None — по числу ядер.
+        with_parents — заполнить и матрицу предшественников (int32, n x n).
+        """
+        if self.weighted:
+            self._check_nonnegative()  # До запуска процессов, а не в каждом из них
+        n = self.vertex_count()
+        typecode = 'f' if self.weighted else 'i'
+        if processes is None:
+            processes = os.cpu_count() or 1
+        processes = min(processes, n)
+
+        if processes <= 1:
+            data = array(typecode, bytes(array(typecode).itemsize * n * n))
+            parents = array('i', bytes(4 * n * n)) if with_parents else None
+            _fill_distance_rows(self, memoryview(data), range(n),
+                                memoryview(parents) if with_parents else None)
+            return DistanceMatrix(self.names, data, self.weighted, parents)
+
+        blocks = []
+        try:
+            # Копируем CSR-массивы в разделяемую память, рядом — общая матрица результата
+            specs = {}
+            arrays = (('offsets', self.offsets, 'q'), ('targets', self.targets, 'i'), ('weights', self.weights, 'd'))
+            for key, values, code in arrays:
+                if values is None:
+                    continue
+                raw = memoryview(values).cast('B')
+                block = shared_memory.SharedMemory(create=True, size=max(len(raw), 1))
+                blocks.append(block)
+                block.buf[:len(raw)] = raw
+                specs[key] = (block.name, len(raw), code)
+            size = array(typecode).itemsize * n * n
+            result = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            blocks.append(result)
+            specs['result'] = (result.name, size, typecode)
+            if with_parents:
+                parent_block = shared_memory.SharedMemory(create=True, size=max(4 * n * n, 1))
+                blocks.append(parent_block)
+                specs['parents'] = (parent_block.name, 4 * n * n, 'i')
+
+            # Мелкие порции сглаживают разницу во времени обхода из разных вершин
+            chunk = max(1, n // (processes * 8))
+            chunks = [range(start, min(start + chunk, n)) for start in range(0, n, chunk)]
+            with multiprocessing.Pool(processes, initializer=_apsp_worker_init,
+                                      initargs=(specs, n, self.directed, self.weighted)) as pool:
+                for _ in pool.imap_unordered(_apsp_worker_rows, chunks):
+                    pass
+
+            data = array(typecode)
+            data.frombytes(result.buf[:size])
+            parents = None
+            if with_parents:
+                parents = array('i')
+                parents.frombytes(parent_block.buf[:4 * n * n])
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+        return DistanceMatrix(self.names, data, self.weighted, parents)
+
+    def bellman_ford_potentials(self):
+        """
+        Алгоритм Беллмана–Форда от фиктивной вершины, соединённой со всеми вершинами
+        рёбрами веса 0, O(VE). Возвращает потенциалы h, для которых все веса
+        w(u, v) + h[u] - h[v] неотрицательны. При отрицательном цикле бросает
+        ValueError с перечнем вершин цикла.
+        """
+        n = self.vertex_count()
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        potentials = [0.0] * n
+        parents = [-1] * n
+
+        for _ in range(n):
+            updated = -1
+            for u in range(n):
+                distance = potentials[u]
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    candidate = distance + weights[k]
+                    if candidate < potentials[v]:
+                        potentials[v] = candidate
+                        parents[v] = u
+                        updated = v
+            if updated < 0:
+                return potentials
+
+        # Обновления не прекратились за n проходов: есть отрицательный цикл.
+        # Отступаем по предкам n шагов, чтобы гарантированно оказаться на цикле
+        for _ in range(n):
+            updated = parents[updated]
+        cycle = [updated]
+        vertex = parents[updated]
+        while vertex != updated:
+            cycle.append(vertex)
+            vertex = parents[vertex]
+        cycle.append(updated)
+        cycle.reverse()
+        raise ValueError("Граф содержит цикл отрицательного веса: "
+                         + " -> ".join(str(self.names[v]) for v in cycle) + ".")
+
+    def johnson(self, processes=1, with_parents=False):
+        """
+        Алгоритм Джонсона для разреженных взвешенных графов, O(VE log V): один проход
+        Беллмана–Форда перевзвешивает рёбра до неотрицательных, затем из каждой вершины
+        запускается Дейкстра (с processes > 1 — параллельно, как в all_pairs_distances).
+        Допускает отрицательные веса; при отрицательном цикле бросает ValueError.
+        Перевзвешивание не меняет кратчайших путей, поэтому предшественники
+        (with_parents) берутся из Дейкстры без пересчёта.
+        """
+        if self.weights is None:
+            return self.all_pairs_distances(processes, with_parents)
+
+        potentials = self.bellman_ford_potentials()
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        reweighted = array('d', bytes(8 * self.edge_count()))
+        for u in range(self.vertex_count()):
+            for k in range(offsets[u], offsets[u + 1]):
+                # Погрешность округления не должна давать отрицательный вес
+                reweighted[k] = max(0.0, weights[k] + potentials[u] - potentials[targets[k]])
+
+        shifted = CSRGraph(self.names, offsets, targets, reweighted, self.directed, True, self.index)
+        matrix = shifted.all_pairs_distances(processes, with_parents)
+
+        # Возвращаем исходные длины: d(u, v) = d'(u, v) - h[u] + h[v]
+        data, n = matrix.data, self.vertex_count()
+        for u in range(n):
+            shift = potentials[u]
+            base = u * n
+            for v in range(n):
+                data[base + v] += potentials[v] - shift
+        return matrix
+
+    def floyd_warshall(self):
+        """
+        Алгоритм Флойда–Уоршелла на матрице NumPy, O(V^3) с векторизацией по строкам:
+        на шаге k вся матрица обновляется одной операцией np.minimum.
+        Возвращает матрицу расстояний и матрицу предшественников
+        (predecessors[i, j] — вершина перед j на кратчайшем пути из i, -1 если пути нет).
+        Подходит для плотных графов; допускает отрицательные веса без отрицательных циклов.
+        """
+        if np is None:
+            raise ImportError("Для алгоритма Флойда–Уоршелла нужен NumPy.")
+
+        n = self.vertex_count()
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        sources = np.repeat(np.arange(n), np.diff(offsets))
+        targets = np.asarray(self.targets, dtype=np.int64)
+        if self.weights is not None:
+            weights = np.asarray(self.weights, dtype=np.float64)
+        else:
+            weights = np.ones(len(targets))
+
+        # Матрица смежности: из кратных рёбер берётся самое лёгкое
+        distances = np.full((n, n), np.inf)
+        np.minimum.at(distances, (sources, targets), weights)
+        predecessors = np.where(np.isfinite(distances), np.arange(n)[:, None], -1).astype(np.int32)
+        diagonal = np.arange(n)
+        loops = distances[diagonal, diagonal] < 0  # Отрицательная петля — уже отрицательный цикл
+        distances[diagonal, diagonal] = np.where(loops, distances[diagonal, diagonal], 0)
+        predecessors[diagonal, diagonal] = np.where(loops, diagonal, -1)
+
+        for k in range(n):
+            # Путь i -> k -> j для всех пар сразу: столбец k плюс строка k
+            through = distances[:, k, None] + distances[k, None, :]
+            better = through < distances
+            np.copyto(distances, through, where=better)
+            np.copyto(predecessors, predecessors[k], where=better)
+
+        if (distances[diagonal, diagonal] < 0).any():
+            raise ValueError("Граф содержит цикл отрицательного веса.")
+        return distances, predecessors
+
+    def save(self, filename):
+        """
+        Записывает граф в бинарный снимок. Массивы пишутся в машинном порядке байтов,
+        поэтому при открытии их не нужно разбирать.
+        """
+        # Имена вершин не содержат пробельных символов, поэтому хранятся одной строкой через '\n'
+        names_blob = '\n'.join(str(name) for name in self.names).encode('utf-8')
+        flags = 0
+        if self.directed:
+            flags |= SNAPSHOT_DIRECTED
+        if self.weighted:
+            flags |= SNAPSHOT_WEIGHTED
+        if sys.byteorder == 'big':
+            flags |= SNAPSHOT_BIG_ENDIAN
+        if self.landmarks is not None:
+            flags |= SNAPSHOT_LANDMARKS
+
+        # Снимок пишется во временный файл рядом с целевым и затем подменяет его:
+        # массивы могут быть отображены из того же файла, и усечение его на месте
+        # обрушило бы процесс (SIGBUS) прямо во время записи
+        temporary = f"{filename}.tmp{os.getpid()}"
+        try:
+            with open(temporary, 'wb') as file:
+                file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags,
+                                                self.vertex_count(), self.edge_count()))
+                _write_section(file, array('q', [len(names_blob)]))
+                _write_section(file, names_blob)
+                _write_section(file, array('q', self.offsets))
+                _write_section(file, array('i', self.targets))
+                if self.weights is not None:
+                    _write_section(file, array('d', self.weights))
+                if self.landmarks is not None:
+                    _write_section(file, array('q', [len(self.landmarks)]))
+                    _write_section(file, array('i', self.landmarks))
+                    _write_section(file, array('d', self.landmark_from))
+                    if self.directed:
+                        _write_section(file, array('d', self.landmark_to))
+            os.replace(temporary, filename)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    @classmethod
+    def open_snapshot(cls, filename):
+        """
+        Открывает бинарный снимок через mmap. Массивы смещений, соседей и весов
+        не копируются в память, а читаются прямо из файла.
+        """
+        with open(filename, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < SNAPSHOT_HEADER.size:
+                raise ValueError(f"Файл '{filename}' не является снимком графа.")
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+
+        magic, version, flags, vertex_count, edge_count = SNAPSHOT_HEADER.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Файл '{filename}' не является снимком графа.")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия снимка: {version}.")
+        if bool(flags & SNAPSHOT_BIG_ENDIAN) != (sys.byteorder == 'big'):
+            raise ValueError("Снимок записан на машине с другим порядком байтов.")
+
+        position = SNAPSHOT_HEADER.size
+
+        def section(length, typecode=None):
+            nonlocal position
+            if length < 0 or position + length > len(buffer):
+                raise ValueError(f"Снимок '{filename}' повреждён или обрезан.")
+            data = view[position:position + length]
+            position += _padded(length)
+            return data.cast(typecode) if typecode else data
+
+        names_length = section(8, 'q')[0]
+        names_blob = section(names_length)
+        names = bytes(names_blob).decode('utf-8').split('\n') if vertex_count else []
+        if len(names) != vertex_count:
+            raise ValueError(f"Снимок '{filename}' повреждён или обрезан.")
+        offsets = section(8 * (vertex_count + 1), 'q')
+        targets = section(array('i').itemsize * edge_count, 'i')
+        weighted = bool(flags & SNAPSHOT_WEIGHTED)
+        weights = section(8 * edge_count, 'd') if weighted else None
+
+        csr = cls(names, offsets, targets, weights, bool(flags & SNAPSHOT_DIRECTED), weighted)
+        if flags & SNAPSHOT_LANDMARKS:
+            landmark_count = section(8, 'q')[0]
+            csr.landmarks = section(array('i').itemsize * landmark_count, 'i')
+            csr.landmark_from = section(8 * landmark_count * vertex_count, 'd')
+            if csr.directed:
+                csr.landmark_to = section(8 * landmark_count * vertex_count, 'd')
+            else:
+                csr.landmark_to = csr.landmark_from
+        csr._buffer = buffer  # Отображение файла живёт столько же, сколько сам снимок
+        return csr
+
+
+def _fill_distance_rows(csr, result, sources, parents=None):
+    # Считает строки матрицы расстояний для заданных исходных вершин и пишет их в result,
+    # а строки предшественников — в parents, если он передан
+    n = csr.vertex_count()
+    search = csr.dijkstra if csr.weighted else csr.bfs
+    for source in sources:
+        if parents is not None:
+            distances, parent_row = search(source, True)
+            parents[source * n:(source + 1) * n] = parent_row
+        else:
+            distances = search(source)
+        if csr.weighted:
+            row = array('f', distances)
+        else:
+            row = array('i', (-1 if d == float('inf') else d for d in distances))
+        result[source * n:(source + 1) * n] = row
+
+
+# Состояние процесса-исполнителя при параллельном поиске путей для всех пар вершин
+_apsp_state = None
+
+
+def _apsp_worker_init(specs, n, directed, weighted):
+    global _apsp_state
+    blocks = []
+    views = {}
+    for key, (name, length, code) in specs.items():
+        # Памятью владеет родительский процесс: он же освобождает её после работы
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        views[key] = block.buf[:length].cast(code)
+    csr = CSRGraph(range(n), views['offsets'], views['targets'], views.get('weights'),
+                   directed, weighted, index={})
+    _apsp_state = (csr, views['result'], views.get('parents'), blocks)
+
+
+def _apsp_worker_rows(sources):
+    csr, result, parents, _ = _apsp_state
+    _fill_distance_rows(csr, result, sources, parents)
+
+
+def _padded(length):
+    return (length + 7) // 8 * 8
+
+
+def _write_section(file, data):
+    file.write(data)
+    length = len(memoryview(data).cast('B'))
+    file.write(b'\0' * (_padded(length) - length))
+
+
+def euclidean_heuristic(coordinates):
+    """
+    Евклидова эвристика для A*: прямое расстояние между точками (x, y).
+    Вершины без координат получают оценку 0, что не нарушает допустимость.
+    """
+    def heuristic(vertex, target):
+        a, b = coordinates.get(vertex), coordinates.get(target)
+        if a is None or b is None:
+            return 0
+        return math.hypot(a[0] - b[0], a[1] - b[1])
+    return heuristic
+
+def haversine_heuristic(coordinates, radius=6371.0):
+    """
+    Эвристика для A* по расстоянию на сфере (формула гаверсинусов).
+    Координаты — (широта, долгота) в градусах, radius задаёт единицы весов рёбер
+    (по умолчанию километры).
+    """
+    def heuristic(vertex, target):
+        a, b = coordinates.get(vertex), coordinates.get(target)
+        if a is None or b is None:
+            return 0
+        lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+        h = (math.sin((lat2 - lat1) / 2) ** 2
+             + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+        return 2 * radius * math.asin(min(1.0, math.sqrt(h)))
+    return heuristic
+
 class Graph:
-    def __init__(self, directed=False, adjacency_list=None, weighted=False):
+    def __init__(self, directed=False, adjacency_list=None, weighted=False, unique_edges=False):
         if adjacency_list is None:
             self.adjacency_list = {}
         else:
             self.adjacency_list = {v: list(adj) for v, adj in adjacency_list.items()}
+        self.vertex_index = VertexIndex(self.adjacency_list)
+        for adj in list(self.adjacency_list.values()):
+            for neighbor, *_ in adj:
+                if neighbor not in self.vertex_index:
+                    self.vertex_index.add(neighbor)
+                    self.adjacency_list[neighbor] = []
         self.directed = directed
         self.weighted = weighted  # Атрибут для определения взвешенности графа
+        self._csr = None  # Кэш CSR-представления, сбрасывается при любом изменении графа
+        # С unique_edges кратные рёбра не хранятся: повторное ребро перезаписывает вес
+        self._unique_edges = unique_edges
+        if unique_edges:
+            self._collapse_parallel_edges()
+        # Обратный индекс позиций: вершина -> {предшественник: [позиции рёбер в его списке
+        # смежности]}. С ним проверка, перезапись и удаление ребра занимают O(1) вместо
+        # просмотра всего списка соседей. Он примерно удваивает память на ребро, поэтому
+        # строится при первом удалении или запросе предшественников (с unique_edges — сразу,
+        # чтобы находить повторные рёбра) и дальше поддерживается
+        self._incoming = None
+        if unique_edges:
+            self._build_incoming()
+        # Индекс полустепеней исхода строится при первом запросе и дальше поддерживается
+        self._degrees = None
+        # Вершины с петлями: вершина -> число петель, обновляется при каждом изменении рёбер
+        self._loops = None
+        self._build_loops()
+        # Компоненты связности неориентированного графа: система непересекающихся множеств
+        # по номерам вершин. Строится при первом запросе, пополняется при добавлении рёбер
+        # и сбрасывается при удалении (разъединение множеств она не поддерживает)
+        self._components = None
+        # Координаты вершин для эвристик A*: вершина -> (x, y) или (широта, долгота)
+        self.coordinates = {}
+
+    def to_csr(self):
+        """
+        Возвращает CSR-представление графа. Оно строится один раз и переиспользуется,
+        пока граф не изменится.
+        """
+        if self._csr is None:
+            self._csr = CSRGraph.from_graph(self)
+        return self._csr
+
+    @property
+    def adjacency_list(self):
+        # Граф, открытый из бинарного снимка, разворачивается в списки смежности
+        # только при первом обращении к ним
+        self._ensure_materialized()
+        return self._adjacency_list
+
+    @adjacency_list.setter
+    def adjacency_list(self, value):
+        self._adjacency_list = value
+
+    def _ensure_materialized(self):
+        if self._adjacency_list is None:
+            self._materialize()
+
+    def _materialize(self):
+        # Строит списки смежности и индексы по CSR-снимку; нумерация вершин сохраняется
+        csr = self._csr
+        names, offsets, targets, weights = csr.names, csr.offsets, csr.targets, csr.weights
+        adjacency_list = {}
+        for i, name in enumerate(names):
+            adjacency_list[name] = [
+                (names[targets[k]], weights[k] if weights is not None else None)
+                for k in range(offsets[i], offsets[i + 1])
+            ]
+        self._adjacency_list = adjacency_list
+        self.vertex_index = VertexIndex(names)
+        self._incoming = None
+        if self._unique_edges:
+            self._build_incoming()
+        self._build_loops()
+
+    def save_snapshot(self, filename):
+        try:
+            self.to_csr().save(filename)
+            print(f"Снимок графа сохранён в файл '{filename}'.")
+        except Exception as e:
+            print(f"Ошибка при сохранении снимка: {e}")
+
+    def load_snapshot(self, filename):
+        """
+        Открывает бинарный снимок без разбора текста. Алгоритмы сразу работают
+        с отображёнными в память CSR-массивами; списки смежности строятся лишь
+        при первом изменении или просмотре графа.
+        """
+        self._adopt_csr(CSRGraph.open_snapshot(filename))
+
+    def _adopt_csr(self, csr):
+        # Граф начинает работать поверх готового CSR: списки смежности и индексы
+        # будут построены лишь при первом изменении или просмотре
+        self.directed = csr.directed
+        self.weighted = csr.weighted
+        self._csr = csr
+        self._adjacency_list = None
+        self.vertex_index = None
+        self._incoming = None
+        self._degrees = None
+        self._loops = None
+        self._components = None
+        self.coordinates = {}
+
+    def load_from_file(self, filename, verbose=False, frozen=False):
+        """
+        Загружает граф из текстового файла за один проход: строки читаются по одной,
+        рёбра сразу попадают в списки смежности, без промежуточной копии.
+        При verbose=True содержимое графа выводится на экран.
+        frozen=True — сразу строить только CSR (CSRGraph.from_file), не создавая кортежей
+        на каждое ребро: для анализа и сохранения снимка больших графов. Списки смежности
+        появятся, только если граф начнут изменять или просматривать.
+        """
+        if frozen:
+            self._adopt_csr(CSRGraph.from_file(filename, self._unique_edges))
+            if verbose:
+                csr = self._csr
+                print(f"Граф из файла '{filename}' загружен в CSR: {csr.vertex_count()} вершин, {csr.edge_count()} записей смежности.")
+            return
 
-    def load_from_file(self, filename):
         with open(filename, 'r') as file:
-            lines = file.readlines()
+            # Определяем тип графа (направленный/ненаправленный) и взвешенный/невзвешенный
+            header = file.readline().strip().lower().split()
+            directed = header[0] == 'directed'
+            weighted = header[1] == 'weighted'
 
-        # Определяем тип графа (направленный/ненаправленный) и взвешенный/невзвешенный
-        header = lines[0].strip().lower().split()
-        self.directed = header[0] == 'directed'
-        self.weighted = header[1] == 'weighted'
+            # Граф собирается отдельно, чтобы при ошибке в файле текущий граф не пострадал
+            graph = Graph(directed=directed, weighted=weighted,
+                          unique_edges=self._unique_edges)
 
-        # Используем словарь для хранения графа
-        self.graph = {}
-        all_vertices = set()
+            for line in file:
+                parts = line.split()
 
-        for i, line in enumerate(lines[1:]):
-            parts = line.strip().split()
+                if not parts:
+                    continue
 
-            if len(parts) == 1:
-                vertex = parts[0]
-                all_vertices.add(vertex)
-                self.graph.setdefault(vertex, [])
-                continue
+                if len(parts) == 1:
+                    graph._ensure_vertex(parts[0])
+                    continue
 
-            if self.weighted:
-                u, v, weight = parts[0], parts[1], float(parts[2])
-                all_vertices.update([u, v])
-                self.graph.setdefault(u, []).append((v, weight))
-                if not self.directed:
-                    if u != v:
-                        self.graph.setdefault(v, []).append((u, weight))
-            else:
-                u, v = parts[0], parts[1]
-                all_vertices.update([u, v])
-                self.graph.setdefault(u, []).append((v, None))
-                if not self.directed:
+                if weighted:
+                    u, v, weight = parts[0], parts[1], float(parts[2])
+                else:
+                    u, v, weight = parts[0], parts[1], None
+                graph._ensure_vertex(u)
+                graph._ensure_vertex(v)
+                graph._insert_edge(u, v, weight)
+                if not directed:
                     if u != v:
-                        self.graph.setdefault(v, []).append((u, None))
+                        graph._insert_edge(v, u, weight)
 
-        # Обеспечиваем наличие всех вершин, включая обособленные
-        for vertex in all_vertices:
-            if vertex not in self.graph:
-                self.graph[vertex] = []
+        # Забираем собранное состояние (списки смежности и все индексы)
+        self.__dict__.update(graph.__dict__)
 
-        # Копируем данные из self.graph в self.adjacency_list для дальнейшего использования
-        self.adjacency_list = self.graph.copy()
+        if verbose:
+            self._print_loaded(filename)
 
+    def _print_loaded(self, filename):
         # Вывод содержимого графа:
         print(f"Граф из файла '{filename}' загружен. Вот его содержимое:")
-        for vertex, edges in self.graph.items():
+        # Вершины с входящими рёбрами собираются одним проходом, без обратного индекса
+        has_incoming = set()
+        if self.directed:
+            for edges in self.adjacency_list.values():
+                has_incoming.update(neighbor for neighbor, *_ in edges)
+        for vertex, edges in self.adjacency_list.items():
             if edges:
                 if self.weighted:
                     edges_str = ', '.join(f"{v} (вес: {weight})" for v, weight in edges)
@@ -63,8 +1548,7 @@ class Graph:
                 print(f"{vertex}: {edges_str}")
             else:
                 if self.directed:
-                    has_incoming = any(vertex in [v for v, _ in adj] for adj in self.graph.values())
-                    if has_incoming:
+                    if vertex in has_incoming:
                         print(f"{vertex}: нет исходящих рёбер")
                     else:
                         print(f"{vertex}: нет рёбер")
@@ -85,11 +1569,163 @@ class Graph:
             print(f"{vertex}: {edges if edges else ''}")
 
     def add_vertex(self, vertex):
-        if vertex not in self.adjacency_list:
-            self.adjacency_list[vertex] = []
-        else:
+        if not self._ensure_vertex(vertex):
             print(f"Вершина {vertex} уже существует.")
 
+    def _ensure_vertex(self, vertex):
+        # Добавляет вершину, если её ещё нет; возвращает True, если вершина новая
+        if vertex in self.adjacency_list:
+            return False
+        self.adjacency_list[vertex] = []
+        self.vertex_index.add(vertex)
+        if self._degrees is not None:
+            self._degrees.add_vertex()
+        if self._components is not None:
+            self._components.add()
+        if self._incoming is not None:
+            self._incoming[vertex] = {}
+        self._csr = None
+        return True
+
+    def has_edge(self, u, v):
+        return u in self.adjacency_list and v in self.adjacency_list and self._edge_position(u, v) is not None
+
+    def _edge_position(self, u, v):
+        # Позиция (первого) ребра u-v в списке смежности u или None:
+        # O(1) по обратному индексу, без него — просмотром списка u
+        if self._incoming is None:
+            return next((i for i, (neighbor, *_) in enumerate(self.adjacency_list[u]) if neighbor == v), None)
+        positions = self._incoming[v].get(u)
+        return positions[0] if positions else None
+
+    def _append_edge(self, u, v, weight):
+        edges = self.adjacency_list[u]
+        if self._incoming is not None:
+            self._incoming[v].setdefault(u, []).append(len(edges))
+        edges.append((v, weight))
+        if self._degrees is not None:
+            self._degrees.change(self.vertex_index.ids[u], 1)
+        if u == v:
+            self._loops[u] = self._loops.get(u, 0) + 1
+        if self._components is not None:
+            ids = self.vertex_index.ids
+            self._components.union(ids[u], ids[v])
+
+    def _insert_edge(self, u, v, weight):
+        # С unique_edges повторное ребро перезаписывает вес, иначе добавляется ещё одно
+        if self._unique_edges:
+            index = self._edge_position(u, v)
+            if index is not None:
+                self.adjacency_list[u][index] = (v, weight)
+                return
+        self._append_edge(u, v, weight)
+
+    def _delete_edge(self, u, v):
+        # Удаляет все рёбра u-v из списка смежности u; возвращает True, если они были.
+        # На место каждой копии ставится последнее ребро списка, O(1) на ребро
+        self._ensure_incoming()
+        if v not in self._incoming:
+            return False
+        positions = self._incoming[v].pop(u, None)
+        if not positions:
+            return False
+        edges = self.adjacency_list[u]
+        # Позиции обходятся по убыванию, поэтому последнее ребро списка
+        # никогда не оказывается ещё не удалённой копией u-v
+        for index in sorted(positions, reverse=True):
+            last = edges.pop()
+            if index < len(edges):
+                edges[index] = last
+                moved = self._incoming[last[0]][u]
+                moved[moved.index(len(edges))] = index
+        removed = len(positions)
+
+        if self._degrees is not None:
+            self._degrees.change(self.vertex_index.ids[u], -removed)
+        self._components = None
+        if u == v:
+            if self._loops[u] > removed:
+                self._loops[u] -= removed
+            else:
+                del self._loops[u]
+        return True
+
+    def _collapse_parallel_edges(self):
+        """
+        Схлопывает кратные рёбра, как при добавлении с перезаписью: остаётся последний вес.
+        """
+        for vertex, edges in self.adjacency_list.items():
+            positions = {}
+            unique_edges = []
+            for edge in edges:
+                neighbor, weight = edge[0], (edge[1] if len(edge) > 1 else None)
+                index = positions.get(neighbor)
+                if index is None:
+                    positions[neighbor] = len(unique_edges)
+                    unique_edges.append((neighbor, weight))
+                else:
+                    unique_edges[index] = (neighbor, weight)
+            self.adjacency_list[vertex] = unique_edges
+
+    def _build_loops(self):
+        self._loops = {}
+        for vertex, edges in self.adjacency_list.items():
+            count = sum(1 for neighbor, *_ in edges if neighbor == vertex)
+            if count:
+                self._loops[vertex] = count
+
+    def _ensure_incoming(self):
+        self._ensure_materialized()
+        if self._incoming is None:
+            self._build_incoming()
+
+    def _build_incoming(self):
+        # Строит обратный индекс: для каждой вершины — позиции входящих рёбер
+        # в списках смежности предшественников
+        self._incoming = {vertex: {} for vertex in self.adjacency_list}
+        for vertex, edges in self.adjacency_list.items():
+            for index, (neighbor, *_) in enumerate(edges):
+                self._incoming[neighbor].setdefault(vertex, []).append(index)
+
+    def predecessors(self, vertex):
+        """
+        Возвращает вершины, из которых есть рёбра в заданную вершину.
+        """
+        self._ensure_incoming()
+        return list(self._incoming[vertex])
+
+    def in_degree(self, vertex):
+        edges = self.adjacency_list[vertex]
+        if not self.directed:
+            return len(edges)
+        self._ensure_incoming()
+        return sum(len(positions) for positions in self._incoming[vertex].values())
+
+    def _detach_vertex(self, vertex):
+        """
+        Удаляет вершину вместе со всеми инцидентными рёбрами за O(степени):
+        входящие рёбра находятся по обратному индексу позиций (он строится один раз,
+        при первом удалении) и удаляются из списков соседей за O(1) каждое.
+        """
+        self._ensure_incoming()
+        self._csr = None
+        # Входящие рёбра: для неориентированного графа предшественники совпадают с соседями
+        for neighbor in self.predecessors(vertex):
+            if neighbor != vertex:
+                self._delete_edge(neighbor, vertex)
+
+        edges = self.adjacency_list.pop(vertex)
+        self._loops.pop(vertex, None)
+        del self._incoming[vertex]
+        for neighbor, *_ in edges:
+            if neighbor != vertex:
+                self._incoming[neighbor].pop(vertex, None)
+        vertex_id = self.vertex_index.remove(vertex)
+        if self._degrees is not None:
+            self._degrees.remove_vertex(vertex_id)
+        self._components = None
+        self.coordinates.pop(vertex, None)
+
     def add_edge(self, u, v, weight=None, overwrite=False):
         # Проверяем существование обеих вершин
         if u not in self.adjacency_list or v not in self.adjacency_list:
@@ -104,79 +1740,51 @@ class Graph:
         else:
             weight = None  # В невзвешенном графе вес не хранится
 
+        self._csr = None
+
         # Проверяем существование ребра
-        if self.weighted:
-            existing_edge = next(((i, w) for i, (neighbor, w) in enumerate(self.adjacency_list[u]) if neighbor == v),
-                                 None)
-        else:
-            existing_edge = next((i for i, (neighbor,) in enumerate(self.adjacency_list[u]) if neighbor == v), None)
+        index = self._edge_position(u, v)
 
-        if existing_edge:
+        if index is not None:
             if overwrite:
-                index, _ = existing_edge
-                if self.weighted:
-                    self.adjacency_list[u][index] = (v, weight)
-                else:
-                    self.adjacency_list[u][index] = (v,)
+                self.adjacency_list[u][index] = (v, weight)
                 print(f"Ребро {u}-{v} обновлено.")
             else:
                 print(f"Ребро {u}-{v} уже существует.")
                 return False  # Указывает, что ребро уже существует и не было перезаписано
         else:
+            self._append_edge(u, v, weight)
             if self.weighted:
-                self.adjacency_list[u].append((v, weight))
                 print(f"Ребро {u}-{v} добавлено с весом {weight}.")
             else:
-                self.adjacency_list[u].append((v,))
                 print(f"Ребро {u}-{v} добавлено.")
 
         if not self.directed and u != v:
-            existing_reverse_edge = next(((i, w) for i, (neighbor, w) in enumerate(self.adjacency_list[v]) if neighbor == u), None)
-            if existing_reverse_edge:
+            reverse_index = self._edge_position(v, u)
+            if reverse_index is not None:
                 if overwrite and self.weighted:
-                    index, _ = existing_reverse_edge
-                    self.adjacency_list[v][index] = (u, weight)
+                    self.adjacency_list[v][reverse_index] = (u, weight)
             else:
-                if self.weighted:
-                    self.adjacency_list[v].append((u, weight))
-                else:
-                    self.adjacency_list[v].append((u,))
+                self._append_edge(v, u, weight)
         return True  # Указывает, что ребро было успешно добавлено или обновлено
 
     def remove_vertex(self, vertex):
         if vertex in self.adjacency_list:
-            # Удаляем все рёбра, связанные с этой вершиной
-            self.adjacency_list.pop(vertex)
-            for adj in self.adjacency_list:
-                if self.weighted:
-                    self.adjacency_list[adj] = [(v, w) for v, w in self.adjacency_list[adj] if v != vertex]
-                else:
-                    self.adjacency_list[adj] = [v for v, *_ in self.adjacency_list[adj] if v != vertex]
+            # Удаляем вершину и все рёбра, связанные с этой вершиной
+            self._detach_vertex(vertex)
         else:
             print(f"Вершина {vertex} не существует.")
 
     def remove_edge(self, u, v):
         if u in self.adjacency_list:
-            if self.weighted:
-                original_length = len(self.adjacency_list[u])
-                self.adjacency_list[u] = [(x, w) for x, w in self.adjacency_list[u] if x != v]
-                if len(self.adjacency_list[u]) < original_length:
-                    print(f"Ребро {u}-{v} удалено.")
-                else:
-                    print(f"Ребро {u}-{v} не существует.")
+            self._csr = None
+            if self._delete_edge(u, v):
+                print(f"Ребро {u}-{v} удалено.")
             else:
-                original_length = len(self.adjacency_list[u])
-                self.adjacency_list[u] = [x for x, *_ in self.adjacency_list[u] if x != v]
-                if len(self.adjacency_list[u]) < original_length:
-                    print(f"Ребро {u}-{v} удалено.")
-                else:
-                    print(f"Ребро {u}-{v} не существует.")
+                print(f"Ребро {u}-{v} не существует.")
 
-            if not self.directed:
-                if self.weighted:
-                    self.adjacency_list[v] = [(x, w) for x, w in self.adjacency_list[v] if x != u]
-                else:
-                    self.adjacency_list[v] = [x for x, *_ in self.adjacency_list[v] if x != u]
+            if not self.directed and v in self.adjacency_list:
+                self._delete_edge(v, u)
         else:
             print(f"Вершина {u} не существует.")
 
@@ -236,190 +1844,602 @@ class Graph:
                         seen_edges.add(edge_key)
         return edge_list
 
+    def _degree_index(self):
+        if self._degrees is None:
+            self._ensure_materialized()
+            self._degrees = DegreeIndex(len(self.adjacency_list[name]) for name in self.vertex_index.names)
+        return self._degrees
+
+    def out_degree(self, vertex):
+        return len(self.adjacency_list[vertex])
+
+    def vertices_with_outdegree_above(self, degree):
+        """
+        Вершины с полустепенью исхода больше degree, от большей к меньшей.
+        """
+        index = self._degree_index()
+        return [self.vertex_index.names[vertex_id] for vertex_id in index.above(degree)]
+
+    def top_outdegree(self, k):
+        """
+        k вершин с наибольшей полустепенью исхода: список пар (вершина, полустепень).
+        """
+        index = self._degree_index()
+        return [(self.vertex_index.names[v], index.degree[v]) for v in index.top(k)]
+
+    def outdegree_histogram(self):
+        """
+        Гистограмма полустепеней исхода: {полустепень: число вершин}.
+        """
+        return self._degree_index().histogram()
+
     def compare_outdegree(self, vertex): # Полустепень
         """
-        Выводит вершины, полустепень исхода которых больше, чем у заданной вершины.
+        Находит вершины, полустепень исхода которых больше, чем у заданной вершины.
+        Возвращает словарь {'vertex', 'outdegree', 'above': [(вершина, полустепень), ...]}.
         """
         if vertex not in self.adjacency_list:
             print(f"Вершина '{vertex}' не найдена в графе.")
-            return
+            return None
 
         outdegree_vertex = len(self.adjacency_list[vertex])  # Полустепень исхода для заданной вершины
-        print(f"Полустепень исхода вершины '{vertex}': {outdegree_vertex}")
 
-        # Сравнение полустепеней исхода
-        for v in self.adjacency_list:
-            if len(self.adjacency_list[v]) > outdegree_vertex:
-                print(f"Вершина '{v}' имеет большую полустепень исхода ({len(self.adjacency_list[v])}).")
+        # Сравнение полустепеней исхода по индексу степеней
+        above = [(v, len(self.adjacency_list[v])) for v in self.vertices_with_outdegree_above(outdegree_vertex)]
+        return {'vertex': vertex, 'outdegree': outdegree_vertex, 'above': above}
+
+    def loop_vertices(self):
+        # Вершины с петлями берутся из поддерживаемого индекса, без просмотра рёбер
+        self._ensure_materialized()
+        return list(self._loops)
+
+    def loop_count(self):
+        # Число вершин с петлями, O(1)
+        self._ensure_materialized()
+        return len(self._loops)
+
+    def has_loop(self, vertex):
+        self._ensure_materialized()
+        return vertex in self._loops
 
     def find_loops(self): # Поиск петлей
         """
-        Выводит вершины, в которых есть петли (ребро, начинающееся и заканчивающееся в одной и той же вершине).
+        Возвращает список вершин, в которых есть петли (ребро, начинающееся и заканчивающееся в одной и той же вершине).
         """
-        loops = [vertex for vertex in self.adjacency_list if any(neighbor == vertex for neighbor, *_ in self.adjacency_list[vertex])]
-
-        if loops:
-            print("Вершины с петлями:", ", ".join(loops))
-        else:
-            print("В графе нет вершин с петлями.")
+        return self.loop_vertices()
 
     def remove_hanging_vertices(self):
-        # Продолжаем удаление висячих вершин до тех пор, пока они есть в графе
-        while True:
-            # Находим все висячие вершины
-            hanging_vertices = [v for v, adj in self.adjacency_list.items() if len(adj) == 1]
+        """
+        Удаляет висячие вершины (у которых в списке смежности одно ребро), пока они есть.
+        Удаление идёт волнами, как и раньше: сначала все текущие висячие вершины,
+        затем те, что стали висячими после этого. Волны считаются на массиве степеней:
+        у предшественников удалённой вершины степень уменьшается на месте, и в следующую
+        волну попадают только они. Отмеченные вершины затем удаляются за один проход,
+        каждая за O(степени), так что вся работа занимает O(V + E).
+        """
+        self._ensure_incoming()
+        ids = self.vertex_index.ids
+        degree = array('i', [0]) * len(self.vertex_index)
+        for vertex, edges in self.adjacency_list.items():
+            degree[ids[vertex]] = len(edges)
+        removed = bytearray(len(degree))
+        hanging_vertices = [v for v, edges in self.adjacency_list.items() if len(edges) == 1]
+        doomed = []
+
+        while hanging_vertices:
+            for vertex in hanging_vertices:
+                removed[ids[vertex]] = 1
+            doomed.extend(hanging_vertices)
+            touched = []
+            for vertex in hanging_vertices:
+                # Степень уменьшается только у тех, кто ссылается на удаляемую вершину
+                for neighbor, positions in self._incoming[vertex].items():
+                    if not removed[ids[neighbor]]:
+                        degree[ids[neighbor]] -= len(positions)
+                        touched.append(neighbor)
 
-            # Если висячих вершин нет, выходим из цикла
-            if not hanging_vertices:
-                break
+            # Следующая волна — соседи, у которых осталось ровно одно ребро
+            hanging_vertices = [v for v in dict.fromkeys(touched) if degree[ids[v]] == 1]
 
-            # Удаляем все висячие вершины
-            for vertex in hanging_vertices:
-                # Удаляем все упоминания висячей вершины в её соседях
-                for neighbor in self.adjacency_list[vertex]:
-                    neighbor_vertex = neighbor[0]
-                    if neighbor_vertex in self.adjacency_list:
-                        if self.weighted:
-                            self.adjacency_list[neighbor_vertex] = [
-                                (v, w) for v, w in self.adjacency_list[neighbor_vertex] if v != vertex
-                            ]
-                        else:
-                            self.adjacency_list[neighbor_vertex] = [
-                                v for v, *_ in self.adjacency_list[neighbor_vertex] if v != vertex
-                            ]
-                # Удаляем саму висячую вершину из графа
-                del self.adjacency_list[vertex]
+        for vertex in doomed:
+            self._detach_vertex(vertex)
+
+    def core_numbers(self):
+        """
+        k-ядерное разложение неориентированного графа: для каждой вершины —
+        наибольшее k, при котором она входит в k-ядро. Возвращает словарь {вершина: k}.
+        """
+        if self.directed:
+            print("Граф ориентированный. k-ядра определены для неориентированных графов.")
+            return None
+        csr = self.to_csr()
+        return dict(zip(csr.names, csr.core_numbers()))
+
+    def k_core(self, k):
+        """
+        Возвращает вершины k-ядра — максимального подграфа, где у каждой вершины не меньше k соседей.
+        """
+        cores = self.core_numbers()
+        if cores is None:
+            return None
+        return [vertex for vertex, core in cores.items() if core >= k]
 
     def is_acyclic(self):
+        """
+        Проверяет ориентированный граф на отсутствие циклов. Сам цикл-пример
+        возвращает find_cycle().
+        """
         if not self.directed:
             print("Граф не ориентированный.")
             return False
+        return self.find_cycle() is None
 
-        visited = set()
-        rec_stack = set()
+    def find_cycle(self):
+        """
+        Возвращает ориентированный цикл в виде списка вершин (первая совпадает
+        с последней) или None, если граф ацикличен.
+        """
+        if not self.directed:
+            print("Граф не ориентированный.")
+            return None
+        csr = self.to_csr()
+        cycle = csr.find_cycle()
+        if cycle is None:
+            return None
+        return [csr.names[v] for v in cycle]
+
+    def topological_sort(self):
+        """
+        Возвращает вершины в топологическом порядке или None, если граф не является
+        ориентированным ацикличным.
+        """
+        if not self.directed:
+            print("Граф не ориентированный.")
+            return None
+        csr = self.to_csr()
+        order = csr.topological_order()
+        if order is None:
+            print("Граф содержит циклы.")
+            return None
+        return [csr.names[v] for v in order]
+
+    def _component_index(self):
+        if self.directed:
+            print("Граф ориентированный. Компоненты связности определены для неориентированных графов.")
+            return None
+        if self._components is None:
+            # Один проход по рёбрам CSR: номера вершин совпадают с vertex_index
+            csr = self.to_csr()
+            offsets, targets = csr.offsets, csr.targets
+            components = DisjointSet(csr.vertex_count())
+            for u in range(csr.vertex_count()):
+                for k in range(offsets[u], offsets[u + 1]):
+                    components.union(u, targets[k])
+            self._ensure_materialized()
+            self._components = components
+        return self._components
+
+    def connected(self, u, v):
+        """
+        Проверяет, лежат ли вершины в одной компоненте связности, почти за O(1).
+        """
+        components = self._component_index()
+        if components is None:
+            return None
+        ids = self.vertex_index.ids
+        if u not in ids or v not in ids:
+            print(f"Ошибка: Вершины '{u}' и/или '{v}' не существуют.")
+            return None
+        return components.connected(ids[u], ids[v])
 
-        def dfs(vertex):
-            if vertex in rec_stack:
-                return True
-            if vertex in visited:
-                return False
+    def component_count(self):
+        components = self._component_index()
+        return None if components is None else components.count
 
-            visited.add(vertex)
-            rec_stack.add(vertex)
+    def connected_components(self):
+        """
+        Возвращает компоненты связности неориентированного графа списком списков вершин.
+        """
+        components = self._component_index()
+        if components is None:
+            return None
+        groups = {}
+        for vertex_id, name in enumerate(self.vertex_index.names):
+            groups.setdefault(components.find(vertex_id), []).append(name)
+        return list(groups.values())
+
+    def component_sizes(self):
+        """
+        Размеры компонент связности по убыванию.
+        """
+        components = self._component_index()
+        if components is None:
+            return None
+        sizes = {}
+        for vertex_id in range(len(components)):
+            root = components.find(vertex_id)
+            sizes[root] = sizes.get(root, 0) + 1
+        return sorted(sizes.values(), reverse=True)
+
+    def strongly_connected_components(self):
+        """
+        Возвращает компоненты сильной связности ориентированного графа списком списков вершин.
+        """
+        if not self.directed:
+            print("Граф не ориентированный.")
+            return None
+        csr = self.to_csr()
+        labels, count = csr.strongly_connected_components()
+        components = [[] for _ in range(count)]
+        for vertex, label in enumerate(labels):
+            components[label].append(csr.names[vertex])
+        return components
+
+    def condensation(self):
+        """
+        Возвращает метки компонент сильной связности {вершина: номер компоненты}
+        и конденсацию графа — ацикличный CSRGraph над номерами компонент.
+        """
+        if not self.directed:
+            print("Граф не ориентированный.")
+            return None
+        csr = self.to_csr()
+        labels, count = csr.strongly_connected_components()
+        return dict(zip(csr.names, labels)), csr.condensation(labels, count)
 
-            for neighbor, *_ in self.adjacency_list.get(vertex, []):
-                if dfs(neighbor):
-                    return True
+    def _dag_paths(self, start_vertex, longest, with_parents):
+        if not self.directed:
+            print("Граф не ориентированный.")
+            return None
+        csr = self.to_csr()
+        if start_vertex not in csr.index:
+            print(f"Вершина '{start_vertex}' не найдена в графе.")
+            return None
+        order = csr.topological_order()
+        if order is None:
+            print("Граф содержит циклы.")
+            return None
+        distances, parents = csr.dag_paths(order, [csr.index[start_vertex]], longest)
+        unreached = float('-inf') if longest else float('inf')
+        return ShortestPathTree(csr.names, csr.index, start_vertex, distances,
+                                parents if with_parents else None, self.weighted, unreached)
+
+    def dag_shortest_paths(self, start_vertex, with_parents=False):
+        """
+        Кратчайшие расстояния из вершины в ацикличном графе за O(V + E).
+        Возвращает ShortestPathTree, как find_shortest_paths; with_parents —
+        сохранить массив предков для восстановления путей.
+        """
+        return self._dag_paths(start_vertex, False, with_parents)
 
-            rec_stack.remove(vertex)
-            return False
+    def dag_longest_paths(self, start_vertex, with_parents=False):
+        """
+        Длиннейшие расстояния из вершины в ацикличном графе за O(V + E).
+        Возвращает ShortestPathTree (недостижимые вершины имеют расстояние -inf);
+        with_parents — сохранить массив предков для восстановления путей.
+        """
+        return self._dag_paths(start_vertex, True, with_parents)
+
+    def critical_path(self):
+        """
+        Критический путь ацикличного графа — самый длинный путь среди всех,
+        начинающихся в любой вершине. Возвращает (длина, список вершин) или None.
+        """
+        if not self.directed:
+            print("Граф не ориентированный.")
+            return None
+        csr = self.to_csr()
+        order = csr.topological_order()
+        if order is None:
+            print("Граф содержит циклы.")
+            return None
+        if not order:
+            return 0, []
+        # Путь может начинаться в любой вершине, поэтому все они — источники
+        distances, parents = csr.dag_paths(order, range(csr.vertex_count()), longest=True)
+        end = max(range(csr.vertex_count()), key=distances.__getitem__)
+        return distances[end], [csr.names[v] for v in csr.parent_path(parents, end)]
+
+    def hop_distance(self, source, target):
+        """
+        Расстояние в шагах между двумя вершинами и сам путь (двунаправленный BFS).
+        Возвращает (расстояние, список вершин) или (inf, None), если пути нет.
+        """
+        csr = self.to_csr()
+        if source not in csr.index or target not in csr.index:
+            print(f"Ошибка: Вершины '{source}' и/или '{target}' не существуют.")
+            return None
+        distance, path = csr.bidirectional_bfs(csr.index[source], csr.index[target])
+        if path is None:
+            return distance, None
+        return distance, [csr.names[v] for v in path]
+
+    def set_coordinates(self, vertex, x, y):
+        """Задаёт координаты вершины для эвристик A*."""
+        if vertex not in self.adjacency_list:
+            print(f"Ошибка: Вершина '{vertex}' не существует.")
+            return
+        self.coordinates[vertex] = (float(x), float(y))
 
-        for node in self.adjacency_list:
-            if node not in visited:
-                if dfs(node):
-                    print("Граф содержит циклы.")
-                    return False
+    def load_coordinates(self, filename):
+        """Загружает координаты вершин из файла со строками вида: вершина x y."""
+        with open(filename, 'r') as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) != 3:
+                    continue
+                vertex, x, y = parts
+                if vertex in self.adjacency_list:
+                    self.coordinates[vertex] = (float(x), float(y))
+
+    def prepare_landmarks(self, k=8, strategy='farthest'):
+        """
+        Выбирает k ориентиров ('farthest' или 'degree') и считает таблицы расстояний
+        для A* с оценками по ориентирам (ALT). Таблицы хранятся в CSR-представлении,
+        записываются в бинарный снимок вместе с графом и сбрасываются при его изменении.
+        Возвращает список выбранных ориентиров.
+        """
+        if not self.weighted:
+            print("Граф невзвешенный. Используйте поиск расстояния в шагах.")
+            return None
+        if strategy not in ('farthest', 'degree'):
+            print(f"Ошибка: Неизвестный способ выбора ориентиров '{strategy}'.")
+            return None
+        csr = self.to_csr()
+        try:
+            csr.build_landmarks(k, strategy)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            return None
+        return [csr.names[v] for v in csr.landmarks]
 
-        print("Граф ацикличен.")
-        return True
+    def astar(self, source, target, heuristic='euclidean'):
+        """
+        Кратчайший путь A* во взвешенном графе. heuristic — функция (вершина, цель),
+        оценивающая остаток пути снизу, 'euclidean' / 'haversine' по координатам
+        вершин или 'landmarks' по таблицам ориентиров; None — обычная Дейкстра до цели.
+        Возвращает (длина, список вершин) или (inf, None), если пути нет.
+        """
+        if not self.weighted:
+            print("Граф невзвешенный. Используйте поиск расстояния в шагах.")
+            return None
+        csr = self.to_csr()
+        if source not in csr.index or target not in csr.index:
+            print(f"Ошибка: Вершины '{source}' и/или '{target}' не существуют.")
+            return None
+
+        potential = None
+        if heuristic == 'landmarks':
+            if csr.landmarks is None:
+                print("Ориентиры не подготовлены.")
+                return None
+            potential = csr.landmark_potential(csr.index[target])
+            heuristic = None
+        elif heuristic == 'euclidean':
+            heuristic = euclidean_heuristic(self.coordinates)
+        elif heuristic == 'haversine':
+            heuristic = haversine_heuristic(self.coordinates)
+        if heuristic is not None:
+            names = csr.names
+            potential = lambda v: heuristic(names[v], target)
 
-    def find_shortest_paths(self, start_vertex):
-        if start_vertex not in self.adjacency_list:
+        try:
+            distance, path = csr.astar(csr.index[source], csr.index[target], potential)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            return None
+        if path is None:
+            return distance, None
+        return distance, [csr.names[v] for v in path]
+
+    def find_shortest_paths(self, start_vertex, with_parents=False):
+        """
+        Кратчайшие расстояния из вершины: Дейкстра во взвешенном графе, BFS в невзвешенном.
+        Возвращает ShortestPathTree; with_parents — сохранить массив предков,
+        чтобы пути восстанавливались без повторного обхода.
+        """
+        csr = self.to_csr()
+        if start_vertex not in csr.index:
             print(f"Вершина '{start_vertex}' не найдена в графе.")
-            return
+            return None
 
-    # Инициализация расстояний и очереди
-        distances = {vertex: float('inf') for vertex in self.adjacency_list}
-        distances[start_vertex] = 0
-        queue = [start_vertex]  # Очередь для обхода BFS
+        source = csr.index[start_vertex]
+        parents = None
+        if self.weighted:
+            # Во взвешенном графе учитываем веса рёбер: алгоритм Дейкстры
+            try:
+                result = csr.dijkstra(source, with_parents)
+            except ValueError as e:
+                print(f"Ошибка: {e}")
+                return None
+        else:
+            # В невзвешенном — обход в ширину
+            result = csr.bfs(source, with_parents)
+        if with_parents:
+            distances, parents = result
+        else:
+            distances = result
 
-    # BFS для вычисления кратчайших путей
-        while queue:
-            current = queue.pop(0)
-            for neighbor, *_ in self.adjacency_list.get(current, []):
-                if distances[neighbor] == float('inf'):  # Если сосед не посещён
-                    distances[neighbor] = distances[current] + 1
-                    queue.append(neighbor)
+        return ShortestPathTree(csr.names, csr.index, start_vertex, distances, parents, self.weighted)
 
-    # Разделение вершин на достижимые и недостижимые
-        reachable = {v: d for v, d in distances.items() if d < float('inf')}
-        unreachable = [v for v, d in distances.items() if d == float('inf')]
+    def find_minimum_spanning_tree(self, algorithm='prim'):
+        """
+        Строит минимальное остовное дерево алгоритмом Прима ('prim')
+        или Краскала ('kruskal'). Возвращает словарь {'edges': [(u, v, вес), ...],
+        'tree_count': число деревьев леса, 'parents': {вершина: предок в дереве}}.
+        """
+        if self.directed:
+            print("Граф ориентированный. Невозможно найти минимальное остовное дерево.")
+            return None
+        if algorithm not in ('prim', 'kruskal'):
+            print(f"Ошибка: Неизвестный алгоритм '{algorithm}'.")
+            return None
+
+        csr = self.to_csr()
+        names = csr.names
+        if algorithm == 'kruskal':
+            mst, tree_count, parents = csr.kruskal(with_parents=True)
+        else:
+            mst, tree_count, parents = csr.prim(with_parents=True)
+
+        return {
+            'edges': [(names[u], names[v], weight) for u, v, weight in mst],
+            'tree_count': tree_count,
+            'parents': {names[v]: names[parent] for v, parent in enumerate(parents) if parent != -1},
+        }
 
+    def find_all_shortest_paths(self, processes=1, algorithm='bfs', with_parents=False):
+        """
+        Длины кратчайших путей для всех пар вершин в виде DistanceMatrix. processes > 1
+        распределяет исходные вершины между процессами (None — по числу ядер).
+        algorithm='bfs' (по умолчанию) — BFS или Дейкстра из каждой вершины,
+        algorithm='floyd' — алгоритм Флойда–Уоршелла на NumPy для плотных графов,
+        algorithm='johnson' — алгоритм Джонсона для разреженных графов с отрицательными весами
+        (при отрицательных весах он используется и по умолчанию).
+        with_parents — заполнить и матрицу предшественников для восстановления путей.
+        """
+        if algorithm not in ('bfs', 'floyd', 'johnson'):
+            print(f"Ошибка: Неизвестный алгоритм '{algorithm}'.")
+            return None
+        csr = self.to_csr()
+        if not csr.vertex_count():
+            print("Граф пуст.")
+            return None
+
+        # Компактная матрица расстояний: строка на каждую исходную вершину
+        if algorithm == 'floyd':
+            try:
+                matrix, predecessors = csr.floyd_warshall()
+            except (ImportError, ValueError) as e:
+                print(f"Ошибка: {e}")
+                return None
+            # Переносим результат в те же компактные массивы, что и у остальных алгоритмов:
+            # float32 (или int32 с -1 для невзвешенного графа) и int32 для предшественников
+            if self.weighted:
+                data = array('f')
+                data.frombytes(matrix.astype(np.float32).tobytes())
+            else:
+                data = array('i')
+                data.frombytes(np.where(np.isinf(matrix), -1, matrix).astype(np.int32).tobytes())
+            parents = None
+            if with_parents:
+                parents = array('i')
+                parents.frombytes(predecessors.astype(np.int32).tobytes())
+            return DistanceMatrix(csr.names, data, self.weighted, parents)
+        if algorithm == 'johnson' or csr.has_negative_weights():
+            # Дейкстра неприменима к отрицательным весам, поэтому для них всегда
+            # используется алгоритм Джонсона
+            try:
+                return csr.johnson(processes, with_parents)
+            except ValueError as e:
+                print(f"Ошибка: {e}")
+                return None
+        return csr.all_pairs_distances(processes, with_parents)
+
+
+# Вывод результатов анализа в консоль. Методы Graph только вычисляют и возвращают
+# результаты; форматирование строк вынесено сюда, чтобы пакетная обработка его не оплачивала
+
+def render_outdegree(result):
+    if result is None:
+        return
+    print(f"Полустепень исхода вершины '{result['vertex']}': {result['outdegree']}")
+    for v, degree in result['above']:
+        print(f"Вершина '{v}' имеет большую полустепень исхода ({degree}).")
+
+def render_loops(loops):
+    if loops:
+        print("Вершины с петлями:", ", ".join(loops))
+    else:
+        print("В графе нет вершин с петлями.")
+
+def render_cycle(cycle):
+    if cycle:
+        print("Граф содержит циклы. Например: " + " -> ".join(str(v) for v in cycle))
+    else:
+        print("Граф ацикличен.")
+
+def render_shortest_paths(tree, show_paths=False):
+    if tree is None:
+        return
     # Сначала выводим кратчайшие пути
-        print(f"Кратчайшие пути из вершины '{start_vertex}':")
-        for vertex, distance in sorted(reachable.items(), key=lambda item: item[1]):
-            print(f"  - До вершины '{vertex}': {distance} шаг(ов).")
+    print(f"Кратчайшие пути из вершины '{tree.source}':")
+    for vertex, distance in sorted(tree.reachable(), key=lambda item: item[1]):
+        if tree.weighted:
+            line = f"  - До вершины '{vertex}': длина пути {distance}."
+        else:
+            line = f"  - До вершины '{vertex}': {distance} шаг(ов)."
+        if show_paths and tree.parents is not None:
+            line += " Путь: " + " -> ".join(tree.path(vertex))
+        print(line)
 
     # Затем выводим недостижимые вершины
-        if unreachable:
-            print("\nНедостижимые вершины:")
-            for vertex in unreachable:
-                print(f"  - Вершина '{vertex}' недостижима.")
+    unreachable = list(tree.unreachable())
+    if unreachable:
+        print("\nНедостижимые вершины:")
+        for vertex in unreachable:
+            print(f"  - Вершина '{vertex}' недостижима.")
+
+def render_spanning_tree(result):
+    if result is None:
+        return
+    # Вывод минимального остовного дерева (леса, если граф несвязный)
+    print("Минимальное остовное дерево:")
+    for u, v, weight in result['edges']:
+        print(f"Ребро {u}-{v} с весом {weight}")
+    if result['tree_count'] > 1:
+        print(f"Граф несвязный: найден минимальный остовный лес из {result['tree_count']} деревьев.")
+
+def render_all_shortest_paths(matrix, show_paths=False):
+    if matrix is None:
+        return
+    names = matrix.names
+    print("Длины кратчайших путей для всех пар вершин:")
+    for start_vertex, end_vertex, distance in matrix.items():
+        if distance == float('inf'):
+            print(f"Путь из вершины '{names[start_vertex]}' до вершины '{names[end_vertex]}' не существует.")
+            continue
+        if matrix.weighted:
+            line = f"Путь из вершины '{names[start_vertex]}' до вершины '{names[end_vertex]}': длина {distance:g}."
+        else:
+            line = f"Путь из вершины '{names[start_vertex]}' до вершины '{names[end_vertex]}': {distance} шаг(ов)."
+        if show_paths and matrix.parents is not None:
+            path = matrix.path(start_vertex, end_vertex)
+            line += " Путь: " + " -> ".join(names[v] for v in path)
+        print(line)
+
+def render_topological_order(order):
+    if order is not None:
+        print("Топологический порядок:", ", ".join(order))
+
+def render_critical_path(result):
+    if result is None:
+        return
+    length, path = result
+    print(f"Критический путь ({length}): {' -> '.join(path)}")
 
-    def find_minimum_spanning_tree(self):
-        if self.directed:
-            print("Граф ориентированный. Невозможно найти минимальное остовное дерево.")
-            return
+def render_components(components, title):
+    if components is None:
+        return
+    print(f"{title}: {len(components)}")
+    for component in components:
+        print("  - " + ", ".join(component))
 
-        # Инициализация структур данных
-        mst = []
-        visited = set()
-        start_vertex = next(iter(self.adjacency_list))
-        visited.add(start_vertex)
-
-        # Функция для нахождения ребра с минимальным весом
-        def find_min_edge(visited):
-            min_edge = None
-            min_weight = float('inf')
-            for u in visited:
-                for v, weight in self.adjacency_list[u]:
-                    if v not in visited and weight < min_weight:
-                        min_weight = weight
-                        min_edge = (u, v, weight)
-            return min_edge
-
-        # Алгоритм Прима
-        while len(visited) < len(self.adjacency_list):
-            min_edge = find_min_edge(visited)
-            if min_edge:
-                u, v, weight = min_edge
-                mst.append(min_edge)
-                visited.add(v)
-
-        # Вывод минимального остовного дерева
-        print("Минимальное остовное дерево:")
-        for edge in mst:
-            print(f"Ребро {edge[0]}-{edge[1]} с весом {edge[2]}")
-
-    def find_all_shortest_paths(self):
-        if not self.adjacency_list:
-            print("Граф пуст.")
-            return
+def render_path(source, target, result, hops=False):
+    # Общий вывод для запросов одного пути: (расстояние, путь) или (inf, None)
+    if result is None:
+        return
+    distance, path = result
+    if path is None:
+        print(f"Путь из вершины '{source}' до вершины '{target}' не существует.")
+    elif hops:
+        print(f"Расстояние: {distance} шаг(ов). Путь: {' -> '.join(path)}")
+    else:
+        print(f"Длина пути: {distance:g}. Путь: {' -> '.join(path)}")
 
-        # Инициализация матрицы расстояний
-        distances = {vertex: {v: float('inf') for v in self.adjacency_list} for vertex in self.adjacency_list}
-
-        # Вычисление кратчайших путей для всех пар вершин
-        for start_vertex in self.adjacency_list:
-            distances[start_vertex][start_vertex] = 0
-            queue = [start_vertex]  # Очередь для обхода BFS
-
-            while queue:
-                current = queue.pop(0)
-                for neighbor, *_ in self.adjacency_list.get(current, []):
-                    if distances[start_vertex][neighbor] == float('inf'):  # Если сосед не посещён
-                        distances[start_vertex][neighbor] = distances[start_vertex][current] + 1
-                        queue.append(neighbor)
-
-        # Вывод длин кратчайших путей для всех пар вершин
-        print("Длины кратчайших путей для всех пар вершин:")
-        for start_vertex in distances:
-            for end_vertex in distances[start_vertex]:
-                distance = distances[start_vertex][end_vertex]
-                if distance == float('inf'):
-                    print(f"Путь из вершины '{start_vertex}' до вершины '{end_vertex}' не существует.")
-                else:
-                    print(f"Путь из вершины '{start_vertex}' до вершины '{end_vertex}': {distance} шаг(ов).")
+def render_landmarks(landmarks):
+    if landmarks is not None:
+        print("Ориентиры:", ", ".join(landmarks))
 
 def console_interface():
     purple = "\033[35m"
@@ -430,7 +2450,7 @@ def console_interface():
         filename = input("Введите имя файла с графом: ").strip()
         try:
             graph = Graph()  # Инициализируем граф перед загрузкой
-            graph.load_from_file(filename)
+            graph.load_from_file(filename, verbose=True)
         except FileNotFoundError:
             print(f"Файл '{filename}' не найден. Создан пустой граф.")
             graph = create_new_graph()
@@ -456,7 +2476,7 @@ def console_interface():
 
             if task_choice == '1':
                 vertex = input("Введите вершину для сравнения полустепеней исхода: ").strip()
-                graph.compare_outdegree(vertex)
+                render_outdegree(graph.compare_outdegree(vertex))
                 break
 
             elif task_choice == '2':
@@ -468,15 +2488,15 @@ def console_interface():
 
             elif task_choice == '3':  # Реализация нахождения кратчайших путей
                 start_vertex = input("Введите начальную вершину: ").strip()
-                graph.find_shortest_paths(start_vertex)
+                render_shortest_paths(graph.find_shortest_paths(start_vertex))
                 break
 
             elif task_choice == '4':  # Реализация нахождения минимального остовного дерева
-                graph.find_minimum_spanning_tree()
+                render_spanning_tree(graph.find_minimum_spanning_tree())
                 break
 
             elif task_choice == '5':  # Реализация нахождения длин кратчайших путей для всех пар вершин
-                graph.find_all_shortest_paths()
+                render_all_shortest_paths(graph.find_all_shortest_paths())
                 break
 
             else:
@@ -508,6 +2528,17 @@ def console_interface():
         print("15. Найти кратчайшие пути из вершины")  # Добавлен новый пункт
         print("16. Найти минимальное остовное дерево")  # Добавлен новый пункт
         print("17. Найти длины кратчайших путей для всех пар вершин")  # Добавлен новый пункт
+        print("18. Сохранить бинарный снимок графа")
+        print("19. Открыть бинарный снимок графа")
+        print("20. Топологическая сортировка")
+        print("21. Найти критический путь")
+        print("22. Найти компоненты сильной связности")
+        print("23. Найти компоненты связности")
+        print("24. Найти расстояние между двумя вершинами")
+        print("25. Найти путь A* по координатам вершин")
+        print("26. Подготовить ориентиры для быстрых запросов путей")
+        print("27. Найти путь A* по ориентирам")
+        print("28. Загрузить большой граф из файла сразу в CSR")
 
         green = "\033[32m"
         choice = input(f"{green}Введите номер действия: ").strip()
@@ -530,7 +2561,7 @@ def console_interface():
             else:
                 weight = None
 
-            edge_exists = any(neighbor == v for neighbor, *_ in graph.adjacency_list.get(u, []))
+            edge_exists = graph.has_edge(u, v)
 
             if edge_exists:
                 overwrite_choice = input(f"Ребро {u}-{v} уже существует. Хотите перезаписать его? (да/нет): ").strip().lower()
@@ -587,7 +2618,7 @@ def console_interface():
         elif choice == '9':
             filename = input("Введите имя файла для загрузки графа: ").strip()
             try:
-                graph.load_from_file(filename)
+                graph.load_from_file(filename, verbose=True)
             except FileNotFoundError:
                 print(f"Файл '{filename}' не найден.")
             except ValueError as ve:
@@ -595,13 +2626,13 @@ def console_interface():
 
         elif choice == '10':
             vertex = input("Введите вершину для сравнения полустепеней исхода: ").strip()
-            graph.compare_outdegree(vertex)
+            render_outdegree(graph.compare_outdegree(vertex))
 
         elif choice == '11':
             break
 
         elif choice == '12':
-            graph.find_loops()
+            render_loops(graph.find_loops())
 
         elif choice == '13':
             graph.remove_hanging_vertices()
@@ -609,17 +2640,93 @@ def console_interface():
             graph.display_adjacency_list()
 
         elif choice == '14':
-            graph.is_acyclic()
+            if graph.directed:
+                render_cycle(graph.find_cycle())
+            else:
+                print("Граф не ориентированный.")
 
         elif choice == '15':  # Вызов кратчайших путей
             start_vertex = input("Введите начальную вершину: ").strip()
-            graph.find_shortest_paths(start_vertex)
+            show_paths = input("Показать сами пути? (да/нет): ").strip().lower() in ['да', 'д', 'yes', 'y']
+            render_shortest_paths(graph.find_shortest_paths(start_vertex, show_paths), show_paths)
 
         elif choice == '16':  # Вызов минимального остовного дерева
-            graph.find_minimum_spanning_tree()
+            render_spanning_tree(graph.find_minimum_spanning_tree())
 
         elif choice == '17':  # Вызов длин кратчайших путей для всех пар вершин
-            graph.find_all_shortest_paths()
+            show_paths = input("Показать сами пути? (да/нет): ").strip().lower() in ['да', 'д', 'yes', 'y']
+            render_all_shortest_paths(graph.find_all_shortest_paths(with_parents=show_paths), show_paths)
+
+        elif choice == '18':
+            filename = input("Введите имя файла для снимка: ").strip()
+            graph.save_snapshot(filename)
+
+        elif choice == '19':
+            filename = input("Введите имя файла снимка: ").strip()
+            try:
+                graph.load_snapshot(filename)
+                print(f"Снимок '{filename}' открыт.")
+            except FileNotFoundError:
+                print(f"Файл '{filename}' не найден.")
+            except ValueError as ve:
+                print(f"Ошибка при открытии снимка: {ve}")
+
+        elif choice == '20':
+            render_topological_order(graph.topological_sort())
+
+        elif choice == '21':
+            render_critical_path(graph.critical_path())
+
+        elif choice == '22':
+            render_components(graph.strongly_connected_components(), "Компонент сильной связности")
+
+        elif choice == '23':
+            render_components(graph.connected_components(), "Компонент связности")
+
+        elif choice == '24':
+            u = input("Введите первую вершину: ").strip()
+            v = input("Введите вторую вершину: ").strip()
+            render_path(u, v, graph.hop_distance(u, v), hops=True)
+
+        elif choice == '25':
+            if not graph.coordinates:
+                filename = input("Введите имя файла с координатами вершин: ").strip()
+                try:
+                    graph.load_coordinates(filename)
+                except FileNotFoundError:
+                    print(f"Файл '{filename}' не найден.")
+                    continue
+                except ValueError as ve:
+                    print(f"Ошибка при загрузке координат: {ve}")
+                    continue
+            u = input("Введите начальную вершину: ").strip()
+            v = input("Введите конечную вершину: ").strip()
+            kind = input("Координаты географические (широта, долгота)? (да/нет): ").strip().lower()
+            heuristic = 'haversine' if kind in ['да', 'д', 'yes', 'y'] else 'euclidean'
+            render_path(u, v, graph.astar(u, v, heuristic))
+
+        elif choice == '26':
+            try:
+                k = int(input("Введите число ориентиров: ").strip())
+            except ValueError:
+                print("Ошибка: Число ориентиров должно быть целым числом.")
+                continue
+            strategy = input("Способ выбора (farthest/degree): ").strip() or 'farthest'
+            render_landmarks(graph.prepare_landmarks(k, strategy))
+
+        elif choice == '27':
+            u = input("Введите начальную вершину: ").strip()
+            v = input("Введите конечную вершину: ").strip()
+            render_path(u, v, graph.astar(u, v, 'landmarks'))
+
+        elif choice == '28':
+            filename = input("Введите имя файла для загрузки графа: ").strip()
+            try:
+                graph.load_from_file(filename, verbose=True, frozen=True)
+            except FileNotFoundError:
+                print(f"Файл '{filename}' не найден.")
+            except ValueError as ve:
+                print(f"Ошибка при загрузке графа: {ve}")
 
         else:
             print("Некорректный ввод.")
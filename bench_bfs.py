@@ -0,0 +1,64 @@
+"""
+Замер времени обхода в ширину (CSRGraph.bfs) на графах до 10^6 вершин.
+Время в пересчёте на V + E должно оставаться примерно постоянным: обход линеен.
+
+Запуск: python bench_bfs.py
+"""
+import importlib.util
+import os
+import random
+import time
+from array import array
+
+# Модуль лабораторной называется 8.py, поэтому обычный import не подходит
+_spec = importlib.util.spec_from_file_location(
+    "graph8", os.path.join(os.path.dirname(os.path.abspath(__file__)), "8.py"))
+graph8 = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(graph8)
+
+
+def path_graph(n):
+    # Цепочка 0 - 1 - ... - n-1: максимально глубокий обход
+    offsets = array('q', [0])
+    targets = array('i')
+    for i in range(n):
+        if i > 0:
+            targets.append(i - 1)
+        if i < n - 1:
+            targets.append(i + 1)
+        offsets.append(len(targets))
+    return graph8.CSRGraph(list(map(str, range(n))), offsets, targets)
+
+
+def random_graph(n, degree=4, seed=0):
+    # Случайный ориентированный граф со средней полустепенью исхода degree: широкий фронт
+    rng = random.Random(seed)
+    offsets = array('q', [0])
+    targets = array('i')
+    for i in range(n):
+        targets.extend(rng.randrange(n) for _ in range(degree))
+        offsets.append(len(targets))
+    return graph8.CSRGraph(list(map(str, range(n))), offsets, targets, directed=True)
+
+
+def measure(csr, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        csr.bfs(0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'граф':<10}{'V':>10}{'E':>10}{'время, с':>12}{'нс на V+E':>12}")
+    for make, label in ((path_graph, "цепочка"), (random_graph, "случайный")):
+        for n in (10 ** 4, 10 ** 5, 10 ** 6):
+            csr = make(n)
+            elapsed = measure(csr)
+            per_item = elapsed / (csr.vertex_count() + csr.edge_count()) * 1e9
+            print(f"{label:<10}{n:>10}{csr.edge_count():>10}{elapsed:>12.3f}{per_item:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()